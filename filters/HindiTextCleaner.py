@@ -1,6 +1,20 @@
 import re
 import os
 import json
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+_NON_PRINTABLE = re.compile(r"[^\x20-\x7E\t\n\r\u0900-\u097F]")
+_NON_HINDI = re.compile(r"[^ऀ-ॿ0-9\s]+")
+_ALPHA = re.compile(r"[a-zA-Z]")
+_ASCII_DIGIT = re.compile(r"[0-9]")
+
+# Documents shorter than this are always cleaned in-process; below it the
+# cost of starting worker processes outweighs the parallel speed-up.
+_PARALLEL_MIN_LINES = 1000
+
+# Upper bound on distinct tokens kept in a cleaner's transliteration cache.
+_TRANSLIT_CACHE_SIZE = 100_000
 
 
 def load_json(filename):
@@ -8,6 +22,13 @@ def load_json(filename):
         return json.load(file)
 
 
+@functools.lru_cache(maxsize=None)
+def _load_data(name, key):
+    """Load ``key`` from a bundled data file once per process."""
+    data_dir = os.path.join(os.path.dirname(__file__), "data")
+    return tuple(load_json(os.path.join(data_dir, name))[key])
+
+
 class HindiTextCleaner:
     def __init__(
         self,
@@ -16,35 +37,39 @@ class HindiTextCleaner:
         numbers=None,
         stopwords_path="Data/stopwords/",
         transliterate=False,
-        remove_non_hindi=True
+        remove_non_hindi=True,
+        n_jobs=1
     ):
-        data_dir = os.path.join(os.path.dirname(__file__), "data")
-
+        # The bundled files are parsed once per process; each instance gets
+        # its own list so callers can still modify it.
         if hindi_punctuations is None:
-            self.hindi_punctuations = load_json(
-                os.path.join(data_dir, "hindi_punctuations.json")
-            )["punctuations"]
+            self.hindi_punctuations = list(
+                _load_data("hindi_punctuations.json", "punctuations")
+            )
         else:
             self.hindi_punctuations = hindi_punctuations
 
         if sundry_stops is None:
-            self.sundry_stops = load_json(os.path.join(data_dir, "sundry_stops.json"))[
-                "stops"
-            ]
+            self.sundry_stops = list(_load_data("sundry_stops.json", "stops"))
         else:
             self.sundry_stops = sundry_stops
 
         if numbers is None:
-            self.numbers = load_json(os.path.join(data_dir, "hindi_numbers.json"))[
-                "numbers"
-            ]
+            self.numbers = list(_load_data("hindi_numbers.json", "numbers"))
         else:
             self.numbers = numbers
 
+        self._digit_table = str.maketrans({str(i): self.numbers[i] for i in range(10)})
+
         self.stopwords_path = stopwords_path
         self.remove_non_hindi = remove_non_hindi
+        # Worker processes for long documents; None means one per CPU.
+        self.n_jobs = n_jobs
         self.transliterate = transliterate
         self.transliterator = None
+        # token -> transliteration; token frequencies are heavily skewed, so
+        # most lookups across a corpus never reach the model.
+        self._translit_cache = {}
         if transliterate:
             # Lazy import of XlitEngine to avoid hard dependency at module import time
             try:
@@ -58,6 +83,14 @@ class HindiTextCleaner:
                 self.transliterate = False
                 self.transliterator = None
 
+    def __getstate__(self):
+        # The transliteration model stays in the parent process; worker
+        # processes only run the line filters (see _clean_chunk).
+        state = self.__dict__.copy()
+        state["transliterator"] = None
+        state["_translit_cache"] = {}
+        return state
+
     def convert_to_hindi_numbers(self, english_num):
         """Converts English numbers to Hindi.
 
@@ -67,13 +100,7 @@ class HindiTextCleaner:
         Returns:
         - str: The number in Hindi.
         """
-        text = ""
-        for char in english_num:
-            if char.isdigit():
-                text += self.numbers[int(char)]
-            else:
-                text += char
-        return text
+        return english_num.translate(self._digit_table)
 
     def translit_english(self, token):
         """Transliterate English words to Hindi Devanagari.
@@ -84,7 +111,7 @@ class HindiTextCleaner:
         Returns:
         - str: The transliterated token.
         """
-        match = re.search("[a-zA-Z]", token)
+        match = _ALPHA.search(token)
         if not match:
             return token
 
@@ -93,14 +120,27 @@ class HindiTextCleaner:
         if not self.transliterator:
             return token
 
-        try:
-            # Use XlitEngine's translit_word method and get top result
-            result = self.transliterator.translit_word(token, topk=1)
-            if result and "hi" in result and result["hi"]:
-                return result["hi"][0]
-        except Exception as e:
-            print(f"[HindiTextCleaner] Error during transliteration for '{token}': {e}")
-
+        cache = self._translit_cache
+        result = cache.get(token)
+        if result is None:
+            try:
+                result = self._translit_uncached(token)
+            except Exception as e:
+                # Not cached: a transient model error should not pin the
+                # untransliterated token for the rest of the run.
+                print(f"[HindiTextCleaner] Error during transliteration for '{token}': {e}")
+                return token
+            if len(cache) >= _TRANSLIT_CACHE_SIZE:
+                # Drop the oldest entry; dicts keep insertion order.
+                del cache[next(iter(cache))]
+            cache[token] = result
+        return result
+
+    def _translit_uncached(self, token):
+        # Use XlitEngine's translit_word method and get top result
+        result = self.transliterator.translit_word(token, topk=1)
+        if result and "hi" in result and result["hi"]:
+            return result["hi"][0]
         return token
 
     def remove_non_printable(self, text):
@@ -113,8 +153,10 @@ class HindiTextCleaner:
         Returns:
         - str: The text after removing non-printable characters.
         """
-        pattern = r'[^\x20-\x7E\t\n\r\u0900-\u097F]'
-        return re.sub(pattern, '', text)
+        # No separate "already clean?" check: when nothing matches, sub hands
+        # back the input object itself, and a pre-scan would cost as much as
+        # the substitution.
+        return _NON_PRINTABLE.sub('', text)
 
     def remove_non_hindi_sentences(self, line):
         """
@@ -126,14 +168,15 @@ class HindiTextCleaner:
         Returns:
         - bool: True if the line is predominantly Hindi, False otherwise.
         """
-        non_hindi_chars = re.findall(r"[^ऀ-ॿ0-9\s]", line)
-        hindi_chars = re.findall(r"[ऀ-ॿ0-9\s]", line)
-
-        total_chars = len(hindi_chars) + len(non_hindi_chars)
+        # Every character is either Hindi or not, so deleting the non-Hindi
+        # runs leaves exactly the Hindi ones. Matching whole runs keeps the
+        # regex engine from returning one match per English character.
+        total_chars = len(line)
         if total_chars == 0:
             return False
 
-        return len(hindi_chars) / total_chars >= 0.7
+        hindi_chars = len(_NON_HINDI.sub('', line))
+        return hindi_chars / total_chars >= 0.7
     
     def spell_check(self, text, threshold=0.9):
         """
@@ -200,43 +243,67 @@ class HindiTextCleaner:
         # Implementation will be added in future releases.
         return []
 
-    def __call__(self, text, save=False):
-        """Cleans the text by removing English words and converting numbers.
+    def _clean_chunk(self, lines):
+        """Drops short and non-Hindi lines and converts digits to Hindi.
 
         Args:
-        - text (str): The text to be cleaned.
-        - save (str, optional): If path or name is passed it will saves the cleaned text to a file.
+        - lines (list): Lines already stripped of non-printable characters.
 
         Returns:
-        - str: The cleaned text.
+        - list: The kept lines. Transliteration is left to the caller.
         """
-        lines = text.split('\n')
-
         cleaned_lines = []
         for line in lines:
-            line = self.remove_non_printable(line)
-            
-            words = line.split()
-            if len(words) < 3:
+            # Only whether there are three words matters, so stop splitting
+            # there instead of building a list of every word in the line.
+            if len(line.split(None, 2)) < 3:
                 continue
 
             if self.remove_non_hindi and not self.remove_non_hindi_sentences(line):
                 continue
 
-            english_numbers = re.findall("[0-9]+", line)
-            # Extract individual digits and store in a set to get unique digits
-            english_numbers = set(digit for number in english_numbers for digit in number)
+            # str.translate looks up every character of a non-ASCII string in
+            # the table, so only pay for it on the few lines with digits.
+            if _ASCII_DIGIT.search(line):
+                line = line.translate(self._digit_table)
+            cleaned_lines.append(line)
+        return cleaned_lines
 
-            # Convert set to a sorted list (optional)
-            english_numbers = sorted(english_numbers)
-            for number in english_numbers:
-                line = line.replace(number, self.convert_to_hindi_numbers(number))
+    def __call__(self, text, save=False):
+        """Cleans the text by removing English words and converting numbers.
 
-            if self.transliterate:
-                tokens = line.split()
-                line = " ".join(map(self.translit_english, tokens))
+        Args:
+        - text (str or bytes): The text to be cleaned; bytes are decoded as UTF-8.
+        - save (str, optional): If path or name is passed it will saves the cleaned text to a file.
 
-            cleaned_lines.append(line)
+        Returns:
+        - str: The cleaned text.
+        """
+        # Newlines are never stripped, so filtering the whole document in one
+        # pass leaves the same lines as filtering each line separately.
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        lines = self.remove_non_printable(text).split('\n')
+
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        if n_jobs > 1 and len(lines) > _PARALLEL_MIN_LINES:
+            size = -(-len(lines) // n_jobs)
+            chunks = [lines[i:i + size] for i in range(0, len(lines), size)]
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                cleaned_lines = [
+                    line for chunk in executor.map(self._clean_chunk, chunks) for line in chunk
+                ]
+        else:
+            cleaned_lines = self._clean_chunk(lines)
+
+        if self.transliterate:
+            # Run the model once per distinct English token in the document
+            # rather than once per occurrence.
+            tokens = {t for line in cleaned_lines for t in line.split() if _ALPHA.search(t)}
+            translit = {t: self.translit_english(t) for t in tokens}
+            cleaned_lines = [
+                " ".join([translit.get(t, t) for t in line.split()]) for line in cleaned_lines
+            ]
 
         text = "\n".join(cleaned_lines)
 
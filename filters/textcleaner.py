@@ -1,8 +1,100 @@
 import codecs
+import functools
+import mmap
 import os
 import re
 from lxml import html
 
+try:
+    # Optional: selectolax extracts text without building an lxml tree.
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+_PUNCTUATED_LINE = re.compile(r".*[।॥?,.]$")
+_DOUBLE_ESCAPED = re.compile(r"\\\\|\\u[0-9a-fA-F]{4}")
+_UNICODE_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{4}")
+
+# Files at least this large are decoded straight from a memory map, so the
+# raw bytes are never copied onto the heap next to the decoded text.
+_MMAP_MIN_BYTES = 64 * 1024 * 1024
+
+# Regex flags used by each pattern-based cleaning method.
+_PATTERN_FLAGS = {
+    "add_newline_on_pattern": re.DOTALL,
+    "select_on_pattern": re.MULTILINE,
+    "insert_on_pattern": re.DOTALL,
+    "remove_line_with_pattern": re.MULTILINE,
+    "remove_patterns": re.DOTALL,
+}
+
+
+def _as_pattern(pattern, flags=0):
+    """Compile ``pattern`` with ``flags`` unless it is already compiled."""
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    return re.compile(pattern, flags)
+
+
+# Methods whose patterns are independent removals and can be applied as one
+# alternation in a single scan instead of one scan per pattern.
+_FUSED_METHODS = frozenset({"remove_line_with_pattern", "remove_patterns"})
+
+
+def _fuse_patterns(patterns, flags):
+    """Compile ``patterns`` into a single alternation where that is safe.
+
+    Patterns with groups (whose numbering would shift), with differing flags,
+    or that only compile on their own are returned compiled but unfused.
+    """
+    compiled = [_as_pattern(pattern, flags) for pattern in patterns]
+    if len(compiled) < 2 or any(
+        p.groups or p.flags != compiled[0].flags for p in compiled
+    ):
+        return compiled
+    try:
+        fused = "|".join("(?:%s)" % p.pattern for p in compiled)
+        return [re.compile(fused, compiled[0].flags)]
+    except (re.error, TypeError):
+        return compiled
+
+
+@functools.lru_cache(maxsize=None)
+def _keyword_pattern(keywords):
+    """Compile a tuple of literal keywords into one alternation.
+
+    A single regex search per line replaces one substring search per keyword.
+    An empty tuple yields a pattern that never matches.
+    """
+    if not keywords:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+@functools.lru_cache(maxsize=None)
+def _repeat_pattern(min_repeat):
+    """Pattern matching any block that occurs ``min_repeat`` times back to back."""
+    return re.compile(r"(.+?)\1{%d}" % (min_repeat - 1), re.DOTALL)
+
+
+def _line_filter(method):
+    """Mark a cleaning method that works on a list of lines.
+
+    The decorated method takes and returns ``list[str]``. When called with a
+    string it splits and re-joins around the call, so it can still be used on
+    its own; ``TextCleaner.__call__`` hands the list straight to the next line
+    filter instead of joining and splitting between every step.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, text, args=None):
+        if isinstance(text, str):
+            return "\n".join(method(self, text.split("\n"), args))
+        return method(self, text, args)
+
+    wrapper.line_filter = True
+    return wrapper
+
 
 class TextCleaner:
     def __init__(self, config, clean_html=False):
@@ -34,30 +126,40 @@ class TextCleaner:
 
         for method, args in config:
             if isinstance(args, str) and args.endswith(".txt"):
-                self.config.append((method, self._read_file(args)))
-            else:
-                self.config.append((method, args))
+                args = self._read_file(args)
+            self.config.append((method, self._precompile(method, args)))
+
+    def _precompile(self, method, args):
+        """Compile the regex arguments of pattern-based methods once, up front."""
+        flags = _PATTERN_FLAGS.get(method)
+        if flags is None or not isinstance(args, (list, tuple)):
+            return args
+        if method == "insert_on_pattern":
+            return [_as_pattern(args[0], flags), *args[1:]]
+        if method in _FUSED_METHODS:
+            return _fuse_patterns(args, flags)
+        return [_as_pattern(pattern, flags) for pattern in args]
 
     def clean_html_with_lxml(self, raw_html):
-        """Clean HTML content using lxml."""
+        """Clean HTML content using selectolax when installed, otherwise lxml."""
+        if HTMLParser is not None:
+            return HTMLParser(raw_html).text()
         tree = html.fromstring(raw_html)
         text = tree.text_content()
         return text
 
-    def filter_punctuated_lines(self, text):
+    @_line_filter
+    def filter_punctuated_lines(self, lines, _=None):
         """Filter lines that end with specified Hindi punctuation marks."""
-        pattern = r".*[।॥?,.]$"
-        lines = text.split("\n")
-        return "\n".join([line for line in lines if re.search(pattern, line)])
+        return [line for line in lines if _PUNCTUATED_LINE.search(line)]
     
 
     def decode_unicode_escapes(self,text):
         """Decodes Unicode escape sequences in a string while preserving normal text."""
         
         def is_double_escaped(text):
-            double_escaped_patterns = [r'\\\\', r'\\u[0-9a-fA-F]{4}']
-            return any(re.search(pattern, text) for pattern in double_escaped_patterns)
-        
+            return _DOUBLE_ESCAPED.search(text) is not None
+
         def decode_match(match):
             try:
                 return bytes(match.group(), "utf-8").decode("unicode_escape")
@@ -72,7 +174,7 @@ class TextCleaner:
                 pass
 
         # Then, replace Unicode escape sequences
-        return re.sub(r'\\u[0-9a-fA-F]{4}', decode_match, text)
+        return _UNICODE_ESCAPE.sub(decode_match, text)
 
     def _read_file(self, filepath, decode_escapes=False):
         """
@@ -90,11 +192,19 @@ class TextCleaner:
         str
             The file content.
         """
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-            if decode_escapes:
-                content = self.decode_unicode_escapes(content)
-            return content
+        # One bulk decode of the raw bytes instead of going through the text
+        # layer; newlines are normalised as text mode would.
+        with open(filepath, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    content = str(mm, "utf-8")
+            else:
+                content = f.read().decode("utf-8")
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        if decode_escapes:
+            content = self.decode_unicode_escapes(content)
+        return content
 
     def __call__(self, input, filter_punctuation=False, decode_escapes=False):
         """
@@ -102,8 +212,9 @@ class TextCleaner:
         
         Parameters:
         ----------
-        input : str
+        input : str or bytes
             A string containing the text to be cleaned or a filepath to a text file.
+            UTF-8 encoded bytes are decoded once and treated as text.
         filter_punctuation : bool, optional
             Whether to filter lines based on punctuation, by default False.
         decode_escapes : bool, optional
@@ -119,47 +230,54 @@ class TextCleaner:
         # Check if the input is a filepath and read the file
         if isinstance(input, str) and os.path.isfile(input):
             text = self._read_file(input, decode_escapes)
-        elif isinstance(input, str):
+        elif isinstance(input, (str, bytes)):
             # Treat input as the text to be cleaned
-            text = input
+            text = input.decode("utf-8") if isinstance(input, bytes) else input
             if decode_escapes:
                 text = self.decode_unicode_escapes(text)
         else:
-            raise ValueError("Input must be a filepath or a string of text")
+            raise ValueError("Input must be a filepath, a string of text or UTF-8 bytes")
 
         if self.clean_html:
             text = self.clean_html_with_lxml(text)
             if not text:
                 return text
         
-        text = self.handle_whitespace(text, None)
+        # The document is split once here. Consecutive line filters share one
+        # list of lines; the text is only joined again when a whole-text
+        # (pattern) method needs it.
+        data = self.handle_whitespace(text.split("\n"), None)
 
         if filter_punctuation:
-            text = self.filter_punctuated_lines(text)
-            if not text:
-                return text
-
+            data = self.filter_punctuated_lines(data)
+            if not data or data == [""]:
+                return ""
         for method_name, args in self.config:
             method = getattr(self, method_name, None)
             if callable(method):
-                text = method(text, args)
-                if not text:
-                    return text
+                if getattr(method, "line_filter", False):
+                    if isinstance(data, str):
+                        data = data.split("\n")
+                elif not isinstance(data, str):
+                    data = "\n".join(data)
+                data = method(data, args)
+                if not data or data == [""]:
+                    return ""
             else:
                 print(f"Method {method_name} not found in the class.")
 
-        return text
+        return data if isinstance(data, str) else "\n".join(data)
 
     def add_newline_on_pattern(self, text, patterns):
         """Insert a newline for each match of given patterns."""
         for pattern in patterns:
-            text = re.sub(pattern, r"\1\n", text, flags=re.DOTALL)
+            text = _as_pattern(pattern, re.DOTALL).sub(r"\1\n", text)
         return text
 
     def select_on_pattern(self, text, patterns):
         """Select text for given patterns."""
         for pattern in patterns:
-            match = re.search(pattern, text, re.MULTILINE)
+            match = _as_pattern(pattern, re.MULTILINE).search(text)
             if match:
                 text = match.group(1)
         return text
@@ -167,151 +285,129 @@ class TextCleaner:
     def insert_on_pattern(self, text, args):
         """Insert on matrched pattern."""
         pattern, rep = args[0], args[1]
-        return re.sub(pattern, rep, text, flags=re.DOTALL)
+        return _as_pattern(pattern, re.DOTALL).sub(rep, text)
 
-    def remove_line_with_keyword(self, text, keywords):
+    @_line_filter
+    def remove_line_with_keyword(self, lines, keywords):
         """Remove lines containing any of the specified keywords."""
-        lines = text.split("\n")
-        return "\n".join(
-            [line for line in lines if not any(keyword in line for keyword in keywords)]
-        )
+        search = _keyword_pattern(tuple(keywords)).search
+        return [line for line in lines if not search(line)]
 
     def remove_line_with_pattern(self, text, patterns):
-        """Remove lines matching any of the given patterns."""
+        """Remove lines matching any of the given patterns.
+
+        Patterns passed through the constructor config are fused into one
+        alternation, so where two patterns match overlapping text the one
+        listed first wins. The fused pattern also makes a single pass: text
+        brought together by one pattern's removal is not re-scanned by the
+        patterns after it, as it was when each pattern ran in turn.
+        """
         for pattern in patterns:
-            text = re.sub(pattern, "", text, flags=re.MULTILINE)
+            text = _as_pattern(pattern, re.MULTILINE).sub("", text)
 
         return text
 
-    def remove_line_and_before(self, text, keywords):
+    @_line_filter
+    def remove_line_and_before(self, lines, keywords):
         """Remove a line and the line before it if it contains a keyword."""
-        lines = text.split("\n")
+        search = _keyword_pattern(tuple(keywords)).search
         to_remove = set()
-        for keyword in keywords:
-            for i, line in enumerate(lines):
-                if keyword in line:
-                    to_remove.add(i)
-                    if i > 0:
-                        to_remove.add(i - 1)
-        return "\n".join(
-            [line for idx, line in enumerate(lines) if idx not in to_remove]
-        )
-
-    def remove_line_and_after(self, text, keywords):
+        for i, line in enumerate(lines):
+            if search(line):
+                to_remove.add(i)
+                if i > 0:
+                    to_remove.add(i - 1)
+        return [line for idx, line in enumerate(lines) if idx not in to_remove]
+
+    @_line_filter
+    def remove_line_and_after(self, lines, keywords):
         """Remove a line and the line after it if it contains a keyword."""
-        lines = text.split("\n")
+        search = _keyword_pattern(tuple(keywords)).search
         to_remove = set()
-        for keyword in keywords:
-            for i, line in enumerate(lines):
-                if keyword in line:
-                    to_remove.add(i)
-                    if i < len(lines) - 1:
-                        to_remove.add(i + 1)
-        return "\n".join(
-            [line for idx, line in enumerate(lines) if idx not in to_remove]
-        )
-
-    def remove_line_and_above(self, text, keywords):
+        for i, line in enumerate(lines):
+            if search(line):
+                to_remove.add(i)
+                if i < len(lines) - 1:
+                    to_remove.add(i + 1)
+        return [line for idx, line in enumerate(lines) if idx not in to_remove]
+
+    @_line_filter
+    def remove_line_and_above(self, lines, keywords):
         """Remove a line and all lines above it if it contains a keyword."""
-        lines = text.split("\n")
-        for keyword in keywords:
-            to_remove = set()
-            for i, line in enumerate(lines):
-                if keyword in line:
-                    if i > 0:
-                        to_remove.update(range(0, i + 1))
-                    else:
-                        to_remove.add(i)
-            lines = [line for idx, line in enumerate(lines) if idx not in to_remove]
-        return "\n".join(lines)
-
-    def remove_line_and_below(self, text, keywords):
+        # Everything up to the last matching line goes, so scan from the end
+        # and stop at the first hit.
+        search = _keyword_pattern(tuple(keywords)).search
+        for i in range(len(lines) - 1, -1, -1):
+            if search(lines[i]):
+                return lines[i + 1:]
+        return lines
+
+    @_line_filter
+    def remove_line_and_below(self, lines, keywords):
         """Remove a line and all lines below it if it contains a keyword."""
-        lines = text.split("\n")
-        for keyword in keywords:
-            to_remove = set()
-            for i, line in enumerate(lines):
-                if keyword in line:
-                    if i < len(lines) - 1:
-                        to_remove.update(range(i, len(lines)))
-                    else:
-                        to_remove.add(i)
-            lines = [line for idx, line in enumerate(lines) if idx not in to_remove]
-        return "\n".join(lines)
-
-    def remove_after_keyword(self, text, keywords):
-        """Remove all words in a line after a specified keyword."""
-        lines = text.split("\n")
+        # Everything from the first matching line goes.
+        search = _keyword_pattern(tuple(keywords)).search
         for i, line in enumerate(lines):
-            for keyword in keywords:
-                if keyword in line:
-                    index = line.find(keyword)
-                    lines[i] = line[:index].strip()
-        return "\n".join(lines)
+            if search(line):
+                return lines[:i]
+        return lines
+
+    @_line_filter
+    def remove_after_keyword(self, lines, keywords):
+        """Remove all words in a line after a specified keyword."""
+        search = _keyword_pattern(tuple(keywords)).search
+        cleaned = []
+        for line in lines:
+            match = search(line)
+            cleaned.append(line[: match.start()].strip() if match else line)
+        return cleaned
 
-    def remove_single_word_lines(self, text, _):
+    @_line_filter
+    def remove_single_word_lines(self, lines, _):
         """Remove lines that consist of a single word."""
-        lines = text.split("\n")
-        return "\n".join([line for line in lines if len(line.split()) != 1])
+        return [line for line in lines if len(line.split()) != 1]
 
-    def remove_blank_lines(self, text, _):
+    @_line_filter
+    def remove_blank_lines(self, lines, _):
         """Remove lines that are blank or contain only whitespace."""
-        lines = text.split("\n")
-        return "\n".join([line for line in lines if line.strip()])
+        return [line for line in lines if line.strip()]
 
-    def remove_lines_starting_with(self, text, keywords):
+    @_line_filter
+    def remove_lines_starting_with(self, lines, keywords):
         """Remove lines starting with any of the given keywords."""
-        lines = text.split("\n")
-        return "\n".join(
-            [
-                line
-                for line in lines
-                if not any(line.startswith(keyword) for keyword in keywords)
-            ]
-        )
+        prefixes = tuple(keywords)
+        return [line for line in lines if not line.startswith(prefixes)]
 
-    def handle_whitespace(self, text, _):
+    @_line_filter
+    def handle_whitespace(self, lines, _):
         """Trim leading and trailing whitespace from each line."""
-        lines = text.split("\n")
-        return "\n".join([line.strip() for line in lines])
+        return [line.strip() for line in lines]
 
-    def remove_redundant_lines(self, text, _):
+    @_line_filter
+    def remove_redundant_lines(self, lines, _):
         """Remove duplicate lines from the text."""
-        lines = text.split("\n")
-        seen = set()
-        unique_lines = []
-        for line in lines:
-            if line not in seen:
-                seen.add(line)
-                unique_lines.append(line)
-        return "\n".join(unique_lines)
+        # dict keeps first-seen order and only references the line objects
+        # that end up in the output, with their hashes cached on the strings.
+        return list(dict.fromkeys(lines))
 
-    def remove_lines_with_repeated_seqs(self, text, min_repeat):
+    @_line_filter
+    def remove_lines_with_repeated_seqs(self, lines, min_repeat):
         """Remove lines containing repeated sequences."""
-        lines = text.split("\n")
-        cleaned_lines = [
-            line for line in lines if not self.has_repeated_substring(line, min_repeat)
-        ]
-        return "\n".join(cleaned_lines)
+        return [line for line in lines if not self.has_repeated_substring(line, min_repeat)]
 
     def has_repeated_substring(self, line, min_repeat):
-        """Check if a line contains repeated substrings."""
-        length = len(line)
-        checked_substrings = set()
-        for i in range(1, length // min_repeat + 1):
-            for start in range(0, i):
-                substring = line[start : start + i]
-                if substring in checked_substrings:
-                    continue
-                checked_substrings.add(substring)
-                if substring * min_repeat in line:
-                    return True
-        return False
+        """Check if a line contains a substring repeated ``min_repeat`` times in a row."""
+        return _repeat_pattern(min_repeat).search(line) is not None
 
     def remove_patterns(self, text, patterns):
-        """Remove all occurrences of the specified patterns."""
+        """Remove all occurrences of the specified patterns.
+
+        As with ``remove_line_with_pattern``, config patterns are fused into
+        one alternation and removed in a single pass, so a match that only
+        appears once an earlier pattern's match is removed is left in place.
+        """
         for pattern in patterns:
-            text = re.sub(pattern, "", text, flags=re.DOTALL)
+            text = _as_pattern(pattern, re.DOTALL).sub("", text)
         return text
 
 
@@ -9,7 +9,10 @@ import sys
 import shutil
 import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Optional
 
 # Add parent to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -18,6 +21,60 @@ from filters.textcleaner import TextCleaner
 from filters.HindiTextCleaner import HindiTextCleaner
 from filters.badwords_en_hi_hiR import badword_list
 
+# Single-line LaTeX spans protected from cleaning: `code`, $$display$$ and
+# $inline$. One alternation so the text is scanned once; the leftmost span wins.
+_LATEX_SPAN = re.compile(r'`[^\n]*?`|\$\$[^\n]*?\$\$|\$[^\n\$]+\$')
+_LATEX_PLACEHOLDER = re.compile(r'__LTX_\d+__')
+_TABLE_SEPARATOR = re.compile(r'^[\s\|\-\:]+$')
+_PAREN_ENGLISH = re.compile(r'\([a-zA-Z]+\)')
+_EXTRA_NEWLINES = re.compile(r'\n{3,}')
+
+# Consecutive prose lines handed to HindiTextCleaner in one call
+_HINDI_BATCH_LINES = 1000
+
+
+def trie_pattern(words) -> str:
+    """
+    Build a regex source matching any of the given literal words.
+
+    The words are factored into a prefix trie, so the regex engine only
+    follows branches that can still match at each position instead of trying
+    every word in turn (Aho-Corasick-style scanning with plain ``re``).
+    Where several words match at the same position the longest one wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(
+            (item for item in node.items() if item[0] is not None))]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if None in node else body
+
+    return build(trie)
+
+
+# Pipeline owned by each worker process of CleaningPipeline.process_files
+_worker_pipeline = None
+
+
+def _init_worker(transliterate: bool, filter_badwords: bool) -> None:
+    """Build the worker's pipeline once, when the process starts."""
+    global _worker_pipeline
+    _worker_pipeline = CleaningPipeline(transliterate=transliterate, filter_badwords=filter_badwords)
+
+
+def _process_job(job: tuple) -> bool:
+    """Clean one (source, dest) job in a worker process."""
+    source, dest = job
+    return _worker_pipeline.process_file(source, dest)
+
 
 class CleaningPipeline:
     """
@@ -43,18 +100,29 @@ class CleaningPipeline:
             ("remove_blank_lines", None),
         ]
         self.textcleaner = TextCleaner(config)
-        self.hicleaner = HindiTextCleaner(transliterate=transliterate)
+        self._hicleaner = None
         
         # Load bad words set
         self.bad_words_set = self._load_bad_words()
+        # One scan finds every bad word; the lookahead reports matches that
+        # start inside an earlier one so overlapping words are all masked.
+        self._bad_word_re = re.compile("(?=(%s))" % trie_pattern(self.bad_words_set))
     
-    def _load_bad_words(self) -> set:
+    @property
+    def hicleaner(self) -> HindiTextCleaner:
+        """Hindi cleaner, built on first use.
+        
+        Building it loads the transliteration model, which a pipeline that
+        only hands files to worker processes never needs.
+        """
+        if self._hicleaner is None:
+            self._hicleaner = HindiTextCleaner(transliterate=self.transliterate)
+        return self._hicleaner
+    
+    def _load_bad_words(self) -> frozenset:
         """Load bad words from the badword_list."""
-        b_set = set()
-        for w in badword_list:
-            if len(w.strip()) > 1:
-                b_set.add(w.strip().lower())
-        return b_set
+        stripped = (w.strip() for w in badword_list)
+        return frozenset(w.lower() for w in stripped if len(w) > 1)
     
     def check_bad_word(self, text: str) -> bool:
         """
@@ -69,40 +137,40 @@ class CleaningPipeline:
         if not self.filter_badwords or not self.bad_words_set:
             return False
         
-        text_lower = text.lower()
-        for bad_word in self.bad_words_set:
-            if bad_word in text_lower:
-                return True
-        return False
+        return self._bad_word_re.search(text.lower()) is not None
 
     def mask_bad_words(self, text: str) -> str:
         """Mask bad words in-place instead of dropping the entire line.
 
         Each bad word occurrence is replaced with asterisks of the same length,
-        preserving surrounding text.
+        preserving surrounding text. Where bad words overlap, their union is
+        masked.
         """
         if not self.filter_badwords or not self.bad_words_set or not text:
             return text
 
         lower = text.lower()
-        for bad_word in self.bad_words_set:
-            start = 0
-            bw_len = len(bad_word)
-            if bw_len == 0:
-                continue
-
-            while True:
-                idx = lower.find(bad_word, start)
-                if idx == -1:
-                    break
+        if len(lower) != len(text):
+            # A few characters (e.g. 'İ') lower-case to two code points; keep
+            # one per character so match offsets still index into text.
+            lower = "".join([ch.lower()[:1] for ch in text])
 
-                end = idx + bw_len
-                # Replace in the original text; keep length same
-                text = text[:idx] + ("*" * bw_len) + text[end:]
-                lower = text.lower()
-                start = end
+        pieces = []
+        pos = 0
+        for match in self._bad_word_re.finditer(lower):
+            end = match.end(1)
+            if end <= pos:
+                continue
+            # Merge with the previous span if this match starts inside it
+            start = max(match.start(), pos)
+            pieces.append(text[pos:start])
+            pieces.append("*" * (end - start))
+            pos = end
 
-        return text
+        if not pieces:
+            return text
+        pieces.append(text[pos:])
+        return "".join(pieces)
     
     def clean_text(self, text: str) -> str:
         """
@@ -117,46 +185,75 @@ class CleaningPipeline:
         if not text:
             return ""
         
-        # --- STEP 1: PROTECT LATEX (STRICTLY SINGLE-LINE) ---
-        latex_map = {}
-        latex_counter = [0]
+        text = '\n'.join(self._clean_lines(text.split('\n')))
+        
+        text = _EXTRA_NEWLINES.sub('\n\n', text)
+        return text.strip()
+    
+    def clean_text_stream(self, in_f, out_f) -> None:
+        """
+        Clean a text stream line by line, writing results as they are ready.
+        
+        Gives the same output as ``out_f.write(self.clean_text(in_f.read()))``
+        without holding the whole document in memory. Cleaned lines are never
+        blank, so there are no blank-line runs to collapse; only the leading
+        and trailing whitespace of the result needs trimming.
         
-        def protect_latex(match):
-            placeholder = f"__LTX_{latex_counter[0]}__"
-            latex_map[placeholder] = match.group(0)
-            latex_counter[0] += 1
-            return placeholder
+        Args:
+            in_f: Readable text stream
+            out_f: Writable text stream
+        """
+        pending = None
+        for cleaned in self._clean_lines(line.rstrip('\n') for line in in_f):
+            if pending is None:
+                cleaned = cleaned.lstrip()
+            else:
+                out_f.write(pending)
+                out_f.write('\n')
+            pending = cleaned
+        if pending is not None:
+            out_f.write(pending.rstrip())
+    
+    def _clean_lines(self, lines):
+        """
+        Clean an iterable of lines, yielding the lines that are kept.
         
-        text = re.sub(r'(`[^\n]*?`)', protect_latex, text)
-        text = re.sub(r'(\$\$[^\n]*?\$\$)', protect_latex, text)
-        text = re.sub(r'(\$[^\n\$]+\$)', protect_latex, text)
+        LaTeX spans never cross a newline, so they are protected and restored
+        per line. Runs of consecutive prose lines go through HindiTextCleaner
+        in one call (it filters each line independently), which saves a call
+        and its setup per line.
+        """
+        batch = []
         
-        # --- STEP 2: SMART LINE-BY-LINE PROCESSING ---
-        lines = text.split('\n')
-        final_cleaned_lines = []
+        def flush():
+            text = self.hicleaner('\n'.join(batch))
+            batch.clear()
+            return [line for line in text.split('\n') if line.strip()] if text else []
         
         for line in lines:
+            # --- STEP 1: PROTECT LATEX (STRICTLY SINGLE-LINE) ---
+            latex_map = {}
+            
+            def protect_latex(match):
+                placeholder = f"__LTX_{len(latex_map)}__"
+                latex_map[placeholder] = match.group(0)
+                return placeholder
+            
+            line = _LATEX_SPAN.sub(protect_latex, line)
+            
+            # --- STEP 2: SMART LINE PROCESSING ---
             stripped = line.strip()
             
             # 2a. Identify Table lines
-            is_separator = re.match(r'^[\s\|\-\:]+$', stripped) and '|' in stripped and '-' in stripped
+            # Substring checks first: they rule out ordinary prose without
+            # starting the regex engine.
+            is_separator = '|' in stripped and '-' in stripped and _TABLE_SEPARATOR.match(stripped)
             is_table_row = stripped.startswith('|') and stripped.endswith('|')
             
             # 2b. Identify LaTeX lines
             has_latex = "__LTX_" in line
             
-            if is_table_row or is_separator:
-                # TABLE: Keep as-is
-                final_cleaned_lines.append(line)
-            
-            elif has_latex:
-                # LATEX: Safe clean only
-                cleaned_line = line.replace('$', '')
-                cleaned_line = re.sub(r'\([a-zA-Z]+\)', '', cleaned_line)
-                cleaned_line = self.textcleaner(cleaned_line)
-                final_cleaned_lines.append(cleaned_line)
-            
-            else:
+            if not (is_table_row or is_separator or has_latex):
                 # NORMAL TEXT
 
                 # Mask bad words instead of dropping the line
@@ -164,23 +261,35 @@ class CleaningPipeline:
 
                 # Normal Cleaning
                 cleaned_line = line.replace('$', '')
-                cleaned_line = re.sub(r'\([a-zA-Z]+\)', '', cleaned_line)
-                cleaned_line = self.textcleaner(cleaned_line)
+                cleaned_line = _PAREN_ENGLISH.sub('', cleaned_line)
+                batch.append(self.textcleaner(cleaned_line))
                 
-                # Hindi cleaner
-                cleaned_line = self.hicleaner(cleaned_line)
-                
-                if cleaned_line and cleaned_line.strip():
-                    final_cleaned_lines.append(cleaned_line)
-        
-        text = '\n'.join(final_cleaned_lines)
-        
-        # --- STEP 3: RESTORE LATEX ---
-        for placeholder, original_latex in latex_map.items():
-            text = text.replace(placeholder, original_latex)
+                # Hindi cleaner, once per batch
+                if len(batch) >= _HINDI_BATCH_LINES:
+                    yield from flush()
+                continue
+            
+            if batch:
+                yield from flush()
+            
+            if is_table_row or is_separator:
+                # TABLE: Keep as-is
+                cleaned_line = line
+            else:
+                # LATEX: Safe clean only
+                cleaned_line = line.replace('$', '')
+                cleaned_line = _PAREN_ENGLISH.sub('', cleaned_line)
+                cleaned_line = self.textcleaner(cleaned_line)
+            
+            # --- STEP 3: RESTORE LATEX ---
+            if latex_map:
+                cleaned_line = _LATEX_PLACEHOLDER.sub(
+                    lambda m: latex_map.get(m.group(0), m.group(0)), cleaned_line
+                )
+            yield cleaned_line
         
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        return text.strip()
+        if batch:
+            yield from flush()
     
     def process_file(self, input_path: Path, output_path: Path) -> bool:
         """
@@ -193,30 +302,43 @@ class CleaningPipeline:
         Returns:
             True if successful, False otherwise
         """
+        output_file = output_path / input_path.name.replace(".txt", "_cleaned.txt")
+        # Stream into a sibling .part file and rename it only once complete,
+        # so a failure mid-file never leaves a truncated output behind
+        part_file = output_file.with_name(output_file.name + ".part")
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            cleaned = self.clean_text(content)
-            
-            output_file = output_path / input_path.name.replace(".txt", "_cleaned.txt")
             output_path.mkdir(parents=True, exist_ok=True)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(cleaned)
+            with open(input_path, 'r', encoding='utf-8') as in_f, \
+                    open(part_file, 'w', encoding='utf-8') as out_f:
+                self.clean_text_stream(in_f, out_f)
+            os.replace(part_file, output_file)
             
             return True
         except Exception as e:
             print(f"Error processing {input_path}: {e}")
+            try:
+                part_file.unlink()
+            except OSError:
+                pass
             return False
     
-    def process_files(self, input_path: Path, output_path: Path) -> dict:
+    def process_files(
+        self, input_path: Path, output_path: Path, max_workers: Optional[int] = 1
+    ) -> dict:
         """
         Process files from input path (file, directory, or ZIP).
         
+        Files are independent, so with max_workers != 1 several are cleaned
+        in parallel worker processes, each building its own pipeline (and
+        loading its own transliteration model).
+        
         Args:
             input_path: Path to input (file/dir/zip)
             output_path: Path to output directory
+            max_workers: Worker processes to use; None means one per CPU.
+                The default, 1, processes the files serially with this
+                pipeline
             
         Returns:
             Dict with processing results
@@ -227,8 +349,24 @@ class CleaningPipeline:
         try:
             jobs = self._gather_jobs(input_path, output_path, temp_dirs)
             
-            for source, dest in jobs:
-                if self.process_file(source, dest):
+            outcomes = None
+            if len(jobs) > 1 and max_workers != 1:
+                try:
+                    with ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        initializer=_init_worker,
+                        initargs=(self.transliterate, self.filter_badwords),
+                    ) as executor:
+                        outcomes = list(executor.map(_process_job, jobs))
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. its pipeline failed to initialise);
+                    # outputs are written atomically, so redo all serially
+                    print(f"Worker pool failed ({e}); processing files serially")
+            if outcomes is None:
+                outcomes = [self.process_file(source, dest) for source, dest in jobs]
+            
+            for (source, _), ok in zip(jobs, outcomes):
+                if ok:
                     results["processed"] += 1
                     results["files"].append(str(source.name))
                 else:
@@ -278,14 +416,17 @@ class CleaningPipeline:
 
 
 # Module-level function for backward compatibility
-_default_pipeline = None
+# One pipeline per (transliterate, filter_badwords) combination
+_pipeline_cache = {}
 
 def get_pipeline(transliterate: bool = True, filter_badwords: bool = True) -> CleaningPipeline:
     """Get or create a cleaning pipeline instance."""
-    global _default_pipeline
-    if _default_pipeline is None:
-        _default_pipeline = CleaningPipeline(transliterate=transliterate, filter_badwords=filter_badwords)
-    return _default_pipeline
+    key = (transliterate, filter_badwords)
+    pipeline = _pipeline_cache.get(key)
+    if pipeline is None:
+        pipeline = CleaningPipeline(transliterate=transliterate, filter_badwords=filter_badwords)
+        _pipeline_cache[key] = pipeline
+    return pipeline
 
 
 def master_cleaning_pipeline(text: str, transliterate: bool = True, filter_badwords: bool = True) -> str:
@@ -300,18 +441,28 @@ def master_cleaning_pipeline(text: str, transliterate: bool = True, filter_badwo
     Returns:
         Cleaned text
     """
-    pipeline = CleaningPipeline(transliterate=transliterate, filter_badwords=filter_badwords)
-    return pipeline.clean_text(text)
+    return get_pipeline(transliterate, filter_badwords).clean_text(text)
 
 
 if __name__ == "__main__":
     import argparse
     
+    def _positive_int(value: str) -> int:
+        """argparse type for counts that must be at least 1."""
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+        if number < 1:
+            raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+        return number
+    
     parser = argparse.ArgumentParser(description="Run IndusNLP cleaning pipeline.")
     parser.add_argument("--input", required=True, help="Path to input file/folder/zip")
     parser.add_argument("--output", required=True, help="Output directory")
     parser.add_argument("--no-transliterate", action="store_true", help="Disable transliteration")
     parser.add_argument("--no-filter-badwords", action="store_true", help="Disable bad word filtering")
+    parser.add_argument("--workers", type=_positive_int, default=None, help="Worker processes (default: one per CPU)")
     args = parser.parse_args()
     
     pipeline = CleaningPipeline(
@@ -319,5 +470,5 @@ if __name__ == "__main__":
         filter_badwords=not args.no_filter_badwords
     )
     
-    results = pipeline.process_files(Path(args.input), Path(args.output))
+    results = pipeline.process_files(Path(args.input), Path(args.output), max_workers=args.workers)
     print(f"✅ Processed: {results['processed']}, Failed: {results['failed']}")
@@ -3,6 +3,7 @@ OCR Pipeline - PDF text extraction using Mistral OCR.
 Refactored from test_ocr.py
 """
 
+import hashlib
 import os
 import tempfile
 import shutil
@@ -15,6 +16,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _file_digest(path: str) -> bytes:
+    """BLAKE2b digest of a file's content, read in 1 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
 class OCRPipeline:
     """
     OCR Pipeline for extracting text from PDF files using Mistral OCR API.
@@ -81,7 +91,13 @@ class OCRPipeline:
         
         return "\n\n".join(text_parts)
     
-    def process_pdf_to_file(self, pdf_path: str, output_dir: Path, base_dir: Optional[Path] = None) -> bool:
+    def process_pdf_to_file(
+        self,
+        pdf_path: str,
+        output_dir: Path,
+        base_dir: Optional[Path] = None,
+        ocr_cache: Optional[Dict[bytes, str]] = None
+    ) -> bool:
         """
         Process a single PDF file and save result to a text file.
         
@@ -89,6 +105,8 @@ class OCRPipeline:
             pdf_path: Full path to the PDF file
             output_dir: Directory where output .txt files will be saved
             base_dir: Base directory to compute relative paths (for preserving structure)
+            ocr_cache: Optional dict of content digest -> extracted text; a PDF
+                whose content is already in it is not uploaded again
             
         Returns:
             True if successful, False otherwise
@@ -104,8 +122,15 @@ class OCRPipeline:
             
             txt_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Process PDF
-            text = self.process_pdf(pdf_path)
+            # Process PDF (identical content is only OCR'd once)
+            if ocr_cache is None:
+                text = self.process_pdf(pdf_path)
+            else:
+                digest = _file_digest(pdf_path)
+                text = ocr_cache.get(digest)
+                if text is None:
+                    text = self.process_pdf(pdf_path)
+                    ocr_cache[digest] = text
             
             # Write output
             with open(txt_path, "w", encoding="utf-8") as f:
@@ -146,8 +171,10 @@ class OCRPipeline:
         if not pdf_files:
             return results
         
+        # Corpora often hold the same chapter under several names
+        ocr_cache: Dict[bytes, str] = {}
         for pdf_path in pdf_files:
-            if self.process_pdf_to_file(pdf_path, output_dir, base_dir=directory):
+            if self.process_pdf_to_file(pdf_path, output_dir, base_dir=directory, ocr_cache=ocr_cache):
                 results["processed"] += 1
                 results["files"].append(os.path.basename(pdf_path))
             else:
@@ -3,48 +3,248 @@ Q&A Generation Pipeline - Generate educational Q&A pairs using Google Gemini.
 Refactored from test_qna_generation.py
 """
 
+import io
 import os
 import re
 import json
-import time
+import asyncio
+import threading
 import math
-import tempfile
-import shutil
+import mmap
+import random
+import time
+import unicodedata
 import zipfile
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
 from typing import Optional, List, Dict, Any
 
 from dotenv import load_dotenv
 
+try:
+    # Optional: orjson parses and serialises the Q&A JSON several times faster.
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so either parser is
+# handled by the same except clauses.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 load_dotenv()
 
+# Markdown code fences (```json ... ```) around a model response
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\n?|```$", re.MULTILINE)
+# Trailing commas before a closing bracket, which json rejects
+_TRAILING_COMMA_RE = re.compile(r",(\s*[\]}])")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _salvage_json_items(text: str) -> List[Dict]:
+    """Decode the objects of a JSON array one by one, stopping at the first
+    that does not parse.
+
+    Keeps the complete items of a response cut off mid-array (e.g. by
+    max_output_tokens) instead of losing the whole batch; commas between
+    and after items are skipped.
+    """
+    items: List[Dict] = []
+    pos, end = 1, len(text)  # text[0] is the opening "["
+    while pos < end:
+        while pos < end and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= end or text[pos] == "]":
+            break
+        try:
+            item, pos = _JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        if isinstance(item, dict):
+            items.append(item)
+    return items
+
+
+def _question_key(question: str) -> str:
+    """Key under which two questions count as duplicates.
+
+    casefold() also folds case pairs lower() keeps apart (e.g. "ß"/"SS",
+    final sigma). Unicode punctuation (category P*: "?", quotes, dandas)
+    becomes whitespace, so "X?" and "X ।" collapse; symbols such as "+",
+    "×" or "<" are kept, as they change what a question asks. split()/join
+    then normalises the spacing.
+    """
+    category = unicodedata.category
+    return " ".join(
+        "".join(" " if category(ch)[0] == "P" else ch for ch in question.casefold()).split()
+    )
+
+
+# Static part of the Q&A prompt; only the source text is appended per batch
+_PROMPT_HEAD = """
+You are an expert educational AI that generates detailed, high-quality academic Q&A.
+
+TASK:
+Generate 25 unique, non-repetitive Question–Answer pairs from the given Hindi or bilingual NCERT text,
+distributed evenly among these 5 types:
+1. Multiple Choice Questions (MCQs)
+2. Objective Questions (True/False, Fill in the Blanks, Match the Following)
+3. Summarization Questions
+4. Chain of Thought Questions
+5. Logical Reasoning Questions
+
+OUTPUT: a valid JSON array only (no markdown, no text). Each object follows one of these schemas:
+MCQ: {"type": "MCQ", "question": "string (Hindi or bilingual)", "options": ["Option A", "Option B", "Option C", "Option D"], "correct_answer": "string (exactly one of the options)", "explanation": "3–6 sentence explanation"}
+Other types: {"type": "Objective" | "Summarization" | "Chain of Thought" | "Logical Reasoning", "question": "string", "answer": "detailed 4–8 sentence answer"}
+
+RULES:
+- Avoid exact duplicates.
+- Semantically similar questions allowed if explanations differ.
+- Maintain conceptual variety.
+
+Text:
+"""
+
+# Output cap per call: ~400 tokens per detailed Q&A for the 25 requested,
+# plus headroom for the thinking tokens 2.5 models count against the limit.
+# It stops a runaway response early instead of decoding to the model max.
+_MAX_OUTPUT_TOKENS = 4096 + 25 * 400
+
+# Retry backoff: capped exponential delay plus jitter; quota errors (429)
+# start from a longer base than transient server errors
+_BACKOFF_BASE = 1.0
+_BACKOFF_MAX = 60.0
+_BACKOFF_JITTER = 1.0
+_RATE_LIMIT_BASE = 10.0
+
+
+def _backoff_delay(attempt: int, base: float = _BACKOFF_BASE) -> float:
+    """Capped exponential delay for the given (1-based) attempt, plus jitter."""
+    return min(_BACKOFF_MAX, base * 2 ** (attempt - 1)) + random.uniform(0, _BACKOFF_JITTER)
+
+
+def _server_retry_delay(error: Exception) -> float:
+    """Retry delay suggested by a quota error's RetryInfo detail, if any."""
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is not None:
+            return retry_delay.seconds + retry_delay.nanos / 1e9
+    return 0.0
+
+
+class _RateLimiter:
+    """Delay calls so they stay under requests- and tokens-per-minute quotas.
+
+    Thread-safe: batches call the API from worker threads, and each file runs
+    its own event loop, so the limiter is shared through a lock and waits
+    with time.sleep in the calling worker thread. Requests get one slot every
+    60/rpm seconds; tokens come from a bucket that refills at tpm/60 per
+    second and may go into debt. A limit of 0 disables it.
+    """
+    
+    def __init__(self, rpm: int = 10, tpm: int = 250_000):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self.tpm = tpm
+        self.tokens = float(tpm)
+        self.next_slot = 0.0
+        self.updated = None
+        self._lock = threading.Lock()
+    
+    def acquire(self, est_tokens: int = 0) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Reserve the slot before sleeping, so concurrent callers queue up
+            start = max(now, self.next_slot)
+            self.next_slot = start + self.interval
+            if self.tpm:
+                if self.updated is not None:
+                    self.tokens = min(self.tpm, self.tokens + (now - self.updated) * self.tpm / 60)
+                self.updated = now
+                self.tokens -= min(est_tokens, self.tpm)
+                if self.tokens < 0:
+                    start = max(start, now - self.tokens * 60 / self.tpm)
+        if start > now:
+            time.sleep(start - now)
+
+
+# Input files at least this large are decoded straight from a memory map
+_MMAP_MIN_BYTES = 64 * 1024 * 1024
+
+
+def _read_text(path) -> str:
+    """Read a UTF-8 text file, normalising newlines as text mode would."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+            # Decoding from the map skips the intermediate bytes copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, "utf-8")
+        else:
+            text = f.read().decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _iter_txt_files(directory):
+    """Yield every .txt file (any extension case) under directory, recursively."""
+    # scandir's DirEntry already knows each entry's type, so only directories
+    # need another system call (to list them).
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return  # unreadable directory: skipped silently, as os.walk does
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_txt_files(entry.path)
+            elif entry.name.lower().endswith(".txt") and entry.is_file():
+                yield Path(entry.path)
+
+
 class QnAPipeline:
     """
     Q&A Generation Pipeline using Google Gemini API.
     Generates educational question-answer pairs from Hindi/bilingual text.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-flash"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: str = "gemini-2.5-flash",
+        max_concurrent_files: int = 4,
+        rpm: int = 10,
+        tpm: int = 250_000
+    ):
         """
         Initialize the Q&A pipeline.
         
         Args:
             api_key: Google Gemini API key. If not provided, reads from GEMINI_API_KEY env var.
             model_name: Gemini model to use
+            max_concurrent_files: Files processed at once for directory/ZIP input
+            rpm: Max API requests per minute across all files and batches
+                (default: Gemini 2.5 Flash free tier), 0 = unlimited
+            tpm: Max prompt tokens per minute, 0 = unlimited
         """
         self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
         self.model_name = model_name
+        self.max_concurrent_files = max_concurrent_files
         self._model = None
+        self._model_lock = threading.Lock()
+        self._generation_config = None
+        self._rate_limiter = _RateLimiter(rpm, tpm)
     
     @property
     def model(self):
         """Lazy load Gemini model."""
         if self._model is None:
-            if not self.api_key:
-                raise ValueError("GEMINI_API_KEY not configured. Set it in environment variables.")
-            import google.generativeai as genai
-            genai.configure(api_key=self.api_key)
-            self._model = genai.GenerativeModel(self.model_name)
+            # Files and batches run on several threads; configure only once
+            with self._model_lock:
+                if self._model is None:
+                    if not self.api_key:
+                        raise ValueError("GEMINI_API_KEY not configured. Set it in environment variables.")
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
         return self._model
     
     def _clean_json_response(self, raw: str) -> Optional[List[Dict]]:
@@ -52,108 +252,193 @@ class QnAPipeline:
         if not raw:
             return None
 
-        # ✅ FIXED: Proper regex pattern
-        raw = re.sub(r"``````", "", raw.strip())
+        raw = _FENCE_RE.sub("", raw.strip())
         print(f"🔍 Raw after cleaning: {repr(raw[:200])}...")  # Debug
         
         start, end = raw.find("["), raw.rfind("]") + 1
-        if start == -1 or end <= 0:
+        if start == -1:
             print(f"❌ No JSON array found in: {repr(raw[:100])}")
             return None
 
         text = raw[start:end]
         
         try:
-            result = json.loads(text)
+            try:
+                result = _json_loads(text)
+            except json.JSONDecodeError:
+                # Only pay for the fix-up when the fast path fails
+                result = _json_loads(_TRAILING_COMMA_RE.sub(r"\1", text))
             if not isinstance(result, list):
                 print(f"❌ Expected list, got: {type(result)}")
                 return None
             print(f"✅ Parsed {len(result)} Q&A items")
             return result
         except json.JSONDecodeError as e:
+            # Truncated (no closing "]" or cut inside an item) or broken
+            # further on: keep every complete item before the damage
+            result = _salvage_json_items(_TRAILING_COMMA_RE.sub(r"\1", raw[start:]))
+            if result:
+                print(f"⚠️ Salvaged {len(result)} Q&A items from malformed JSON ({e})")
+                return result
             print(f"JSON parse error: {e}")
             print(f"Failed text: {repr(text[:100])}")
             return None
     
+    def _build_prompt(self, text: str) -> str:
+        """Build the Q&A generation prompt for a chunk of text."""
+        return _PROMPT_HEAD + text[:7000] + "\n"
+    
+    @property
+    def generation_config(self):
+        """Generation settings shared by every batch, built once."""
+        if self._generation_config is None:
+            import google.generativeai as genai
+            
+            self._generation_config = genai.types.GenerationConfig(
+                response_mime_type="application/json",
+                temperature=0.5,
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=_MAX_OUTPUT_TOKENS,
+            )
+        return self._generation_config
+    
     def _generate_batch(self, text: str, seen: set[str]) -> Optional[List[Dict]]:
-        """Generate a single batch of Q&A pairs."""
-        import google.generativeai as genai
-        
-        prompt = f"""
-You are an expert educational AI that generates *detailed, high-quality academic Q&A*.
-
-🎯 TASK:
-Generate 25 **unique** and **non-repetitive** Question–Answer pairs from the given Hindi or bilingual NCERT text.
-
-Distribute evenly among these 5 types:
-1️⃣ Multiple Choice Questions (MCQs)
-2️⃣ Objective Questions (True/False, Fill in the Blanks, Match the Following)
-3️⃣ Summarization Questions
-4️⃣ Chain of Thought Questions
-5️⃣ Logical Reasoning Questions
-
-⚙️ OUTPUT RULES:
-- Return a **valid JSON array only**, no markdown, no text.
-- Each object must follow one of these schemas:
-
-🅰️ For MCQs:
-{{
-  "type": "MCQ",
-  "question": "string (Hindi or bilingual)",
-  "options": ["Option A", "Option B", "Option C", "Option D"],
-  "correct_answer": "string (exactly one of the options)",
-  "explanation": "3–6 sentence explanation"
-}}
-
-📘 For other types:
-{{
-  "type": "Objective" | "Summarization" | "Chain of Thought" | "Logical Reasoning",
-  "question": "string",
-  "answer": "detailed 4–8 sentence answer"
-}}
-
-⚠️ RULES:
-- Avoid exact duplicates.
-- Semantically similar questions allowed if explanations differ.
-- Maintain conceptual variety.
-- Output clean JSON only.
-
-Text:
-{text[:7000]}
-"""
+        """Generate a single batch of Q&A pairs.
+        
+        API errors propagate so the caller can back off by error class;
+        anything else (e.g. an unusable response) yields None.
+        """
+        from google.api_core import exceptions as google_exceptions
         
         try:
+            prompt = self._build_prompt(text)
+            # Wait for quota instead of provoking 429s (~4 chars per token)
+            self._rate_limiter.acquire(est_tokens=len(prompt) // 4)
             response = self.model.generate_content(
                 prompt,
-                generation_config=genai.types.GenerationConfig(
-                    response_mime_type="application/json",
-                    temperature=0.5,
-                    top_p=0.95,
-                    top_k=40,
-                ),
+                generation_config=self.generation_config,
             )
             return self._clean_json_response(response.text)
+        except google_exceptions.GoogleAPICallError:
+            raise
         except Exception as e:
             print(f"⚠️ Gemini error: {e}")
             return None
     
+    async def _generate_batch_async(self, text: str, seen: set[str]) -> Optional[List[Dict]]:
+        """Generate a single batch of Q&A pairs without blocking the event loop."""
+        # The blocking client runs in a worker thread: the SDK's async client
+        # keeps a grpc.aio channel tied to the first event loop it sees, and
+        # generate_qna starts a fresh loop on every call.
+        return await asyncio.to_thread(self._generate_batch, text, seen)
+    
+    def _add_unique(self, qna_data: List[Dict], seen: set[str], all_qna: List[Dict]) -> None:
+        """Append the items of one batch whose question has not been seen yet."""
+        # Filter duplicates - ✅ ADDED TYPE CHECK
+        items = []
+        for item in qna_data:
+            if isinstance(item, dict):
+                items.append(item)
+            else:  # ✅ Safety check
+                print(f"⚠️ Skipping non-dict item: {type(item)}")
+        
+        normalized = [(_question_key(item.get("question", "")), item) for item in items]
+        for q_norm, item in normalized:
+            if q_norm and q_norm not in seen:
+                seen.add(q_norm)
+                all_qna.append(item)
+    
+    async def _generate_batches_async(
+        self,
+        chunks: List[tuple],
+        seen: set[str],
+        num_questions: int,
+        max_retries: int,
+        max_concurrent: int
+    ) -> List[Dict]:
+        """
+        Generate batches concurrently, at most max_concurrent in flight.
+        
+        Results are de-duplicated in batch order as soon as every earlier
+        batch has finished, so the output matches a serial run. Once enough
+        questions are collected the batches still queued are cancelled.
+        """
+        from google.api_core import exceptions as google_exceptions
+        
+        # Server-side and transient: worth retrying
+        retryable = (
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.InternalServerError,
+            google_exceptions.DeadlineExceeded,
+        )
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def run(batch: int, chunk_text: str) -> Optional[List[Dict]]:
+            async with semaphore:
+                for attempt in range(1, max_retries + 1):
+                    try:
+                        qna_data = await self._generate_batch_async(chunk_text, seen)
+                        if qna_data:
+                            return qna_data
+                        delay = _backoff_delay(attempt)
+                    except google_exceptions.ResourceExhausted as e:
+                        # Quota: wait at least as long as the server asks
+                        print(f"⚠️ Batch {batch}: Rate limited: {e}")
+                        delay = max(_backoff_delay(attempt, _RATE_LIMIT_BASE), _server_retry_delay(e))
+                    except retryable as e:
+                        print(f"⚠️ Batch {batch}: Gemini server error: {e}")
+                        delay = _backoff_delay(attempt)
+                    except google_exceptions.GoogleAPICallError as e:
+                        # Bad request, auth, ...: retrying cannot help
+                        print(f"❌ Batch {batch}: Gemini error, not retrying: {e}")
+                        return None
+                    if attempt < max_retries:
+                        await asyncio.sleep(delay)
+            print(f"⚠️ Batch {batch}: Failed after {max_retries} retries.")
+            return None
+        
+        tasks = [asyncio.create_task(run(batch, chunk_text)) for batch, chunk_text in chunks]
+        all_qna: List[Dict] = []
+        try:
+            for task in tasks:
+                qna_data = await task
+                if qna_data:
+                    self._add_unique(qna_data, seen, all_qna)
+                if len(all_qna) >= num_questions:
+                    break
+        finally:
+            # Batches waiting on the semaphore never reach the API; calls
+            # already in a worker thread finish but their results are dropped.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return all_qna
+    
     def generate_qna(
         self,
         text: str,
         num_questions: int = 25,
         batch_size: int = 25,
         chunk_size: int = 6000,
-        max_retries: int = 3
+        max_retries: int = 3,
+        max_concurrent: int = 4
     ) -> List[Dict]:
         """
         Generate Q&A pairs from text.
         
+        Batches are independent API calls, so they are issued concurrently
+        and de-duplicated in batch order; generation stops as soon as
+        num_questions unique questions are available.
+        
         Args:
             text: Source text for Q&A generation
             num_questions: Total number of questions to generate
             batch_size: Questions per API call
             chunk_size: Text chunk size for each batch
             max_retries: Max retries per batch on failure
+            max_concurrent: Max API calls in flight at once
             
         Returns:
             List of Q&A dictionaries
@@ -161,50 +446,36 @@ Text:
         if not text or not text.strip():
             raise ValueError("Input text is empty or contains only whitespace.")
         
-        all_qna: List[Dict] = []
         seen: set[str] = set()
         num_batches = math.ceil(num_questions / batch_size)
         
-        for batch in range(1, num_batches + 1):
-            # Ensure chunk_size doesn't exceed text length
-            effective_chunk_size = min(chunk_size, len(text))
-            start = ((batch - 1) * effective_chunk_size) % len(text)
-            chunk_text = text[start:start + effective_chunk_size]
+        # Ensure chunk_size doesn't exceed text length
+        chunk_size = min(chunk_size, len(text))
+        
+        # Consecutive, non-overlapping chunks are cut once (no more than there
+        # are batches); if the text runs out they are reused round-robin
+        # rather than re-slicing shifted windows of the same text.
+        chunk_texts = []
+        for start in range(0, len(text), chunk_size):
+            chunk_text = text[start:start + chunk_size]
             
             # Skip if chunk is too small
             if len(chunk_text.strip()) < 100:
-                print(f"⚠️ Batch {batch}: Chunk too small ({len(chunk_text.strip())} chars), skipping.")
-                continue
-            
-            qna_data = None
-            for attempt in range(1, max_retries + 1):
-                qna_data = self._generate_batch(chunk_text, seen)
-                if qna_data:
-                    break
-                time.sleep(2)
-            
-            if not qna_data:
-                print(f"⚠️ Batch {batch}: Failed after {max_retries} retries.")
+                print(f"⚠️ Chunk at {start}: too small ({len(chunk_text.strip())} chars), skipping.")
                 continue
             
-            # Filter duplicates - ✅ ADDED TYPE CHECK
-            for item in qna_data:
-                if not isinstance(item, dict):  # ✅ Safety check
-                    print(f"⚠️ Skipping non-dict item: {type(item)}")
-                    continue
-                    
-                q = item.get("question", "").strip()
-                if not q:
-                    continue
-                q_norm = re.sub(r'\s+', ' ', q.lower())
-                if q_norm not in seen:
-                    seen.add(q_norm)
-                    all_qna.append(item)
-            
-            if len(all_qna) >= num_questions:
+            chunk_texts.append(chunk_text)
+            if len(chunk_texts) == num_batches:
                 break
-            
-            time.sleep(1)
+        
+        chunks = [
+            (batch, chunk_texts[(batch - 1) % len(chunk_texts)])
+            for batch in range(1, num_batches + 1)
+        ] if chunk_texts else []
+        
+        all_qna = asyncio.run(
+            self._generate_batches_async(chunks, seen, num_questions, max_retries, max_concurrent)
+        )
         
         if not all_qna:
             raise RuntimeError("No Q&A could be generated from the provided text. Check text quality and API key.")
@@ -230,31 +501,53 @@ Text:
         Returns:
             Dict with results including generated Q&A
         """
-        with open(filepath, "r", encoding="utf-8") as f:
-            text = f.read()
+        source = Path(filepath)
+        text = _read_text(source)
+        return self.process_text(text, source.stem, output_dir, num_questions, batch_size)
+    
+    def process_text(
+        self,
+        text: str,
+        base_name: str,
+        output_dir: str,
+        num_questions: int = 300,
+        batch_size: int = 25
+    ) -> Dict[str, Any]:
+        """
+        Generate Q&A for already-loaded text and save it.
         
-        base_name = os.path.splitext(os.path.basename(filepath))[0]
-        os.makedirs(output_dir, exist_ok=True)
+        Args:
+            text: Source text
+            base_name: Output file name prefix (usually the source file's stem)
+            output_dir: Directory for output files
+            num_questions: Number of questions to generate
+            batch_size: Questions per batch
+            
+        Returns:
+            Dict with results including generated Q&A
+        """
+        out_dir = Path(output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
         
-        output_txt = os.path.join(output_dir, f"{base_name}_QA.txt")
-        output_json = os.path.join(output_dir, f"{base_name}_QA.json")
+        output_txt = str(out_dir / f"{base_name}_QA.txt")
+        output_json = str(out_dir / f"{base_name}_QA.json")
         
         # Generate Q&A
         all_qna = self.generate_qna(text, num_questions, batch_size)
         
-        # Format and save TXT
-        formatted_output = []
-        for i, q in enumerate(all_qna, start=1):
-            question = q.get("question", "")
-            answer = q.get("explanation", q.get("answer", ""))
-            formatted_output.append(f"{i}. {question}\n{answer}\n")
-        
-        with open(output_txt, "w", encoding="utf-8") as f:
-            f.write("\n".join(formatted_output))
+        # Format and save TXT, streamed entry by entry (blank line between)
+        with open(output_txt, "w", encoding="utf-8", buffering=1 << 20) as f:
+            for i, q in enumerate(all_qna, start=1):
+                question = q.get("question", "")
+                answer = q.get("explanation", q.get("answer", ""))
+                f.write(f"{i}. {question}\n{answer}\n" if i == 1 else f"\n{i}. {question}\n{answer}\n")
         
         # Save JSON
-        with open(output_json, "w", encoding="utf-8") as f:
-            json.dump(all_qna, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            Path(output_json).write_bytes(orjson.dumps(all_qna, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_json, "w", encoding="utf-8") as f:
+                json.dump(all_qna, f, ensure_ascii=False, indent=2)
         
         return {
             "success": True,
@@ -269,7 +562,8 @@ Text:
         input_path: Path,
         output_dir: Path,
         num_questions: int = 300,
-        batch_size: int = 25
+        batch_size: int = 25,
+        max_file_concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Handle different input types: TXT file, ZIP file, or directory.
@@ -279,48 +573,40 @@ Text:
             output_dir: Output directory
             num_questions: Questions per file
             batch_size: Questions per batch
+            max_file_concurrency: Files processed at once for directory/ZIP
+                input (defaults to max_concurrent_files)
             
         Returns:
             Dict with processing results
         """
         results = {"processed": 0, "failed": 0, "files": [], "qna": None}
-        temp_dir = None
         
-        try:
-            if input_path.is_file():
-                suffix = input_path.suffix.lower()
-                if suffix == ".txt":
-                    # Single text file
-                    result = self.process_file(
-                        str(input_path),
-                        str(output_dir),
-                        num_questions,
-                        batch_size
-                    )
-                    results["processed"] = 1
-                    results["files"].append(input_path.name)
-                    results["qna"] = result["qna"]
-                    
-                elif suffix == ".zip":
-                    # ZIP file
-                    zip_stem = input_path.stem
-                    temp_dir = Path(tempfile.mkdtemp(prefix="qna_zip_"))
-                    extract_dir = temp_dir / zip_stem
-                    extract_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    with zipfile.ZipFile(input_path, "r") as zip_ref:
-                        zip_ref.extractall(extract_dir)
-                    
-                    target_output = output_dir / zip_stem
-                    target_output.mkdir(parents=True, exist_ok=True)
-                    results = self._process_directory(extract_dir, target_output, num_questions, batch_size)
-                    
-            elif input_path.is_dir():
-                results = self._process_directory(input_path, output_dir, num_questions, batch_size)
+        if input_path.is_file():
+            suffix = input_path.suffix.lower()
+            if suffix == ".txt":
+                # Single text file
+                result = self.process_file(
+                    str(input_path),
+                    str(output_dir),
+                    num_questions,
+                    batch_size
+                )
+                results["processed"] = 1
+                results["files"].append(input_path.name)
+                results["qna"] = result["qna"]
                 
-        finally:
-            if temp_dir and temp_dir.exists():
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            elif suffix == ".zip":
+                # ZIP file
+                target_output = output_dir / input_path.stem
+                target_output.mkdir(parents=True, exist_ok=True)
+                results = self._process_zip(
+                    input_path, target_output, num_questions, batch_size, max_file_concurrency
+                )
+                
+        elif input_path.is_dir():
+            results = self._process_directory(
+                input_path, output_dir, num_questions, batch_size, max_file_concurrency
+            )
         
         return results
     
@@ -329,25 +615,70 @@ Text:
         directory: Path,
         output_dir: Path,
         num_questions: int,
-        batch_size: int
+        batch_size: int,
+        max_file_concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """Process all TXT files in a directory."""
-        results = {"processed": 0, "failed": 0, "files": []}
+        txt_files = list(_iter_txt_files(directory))
         
-        txt_files = []
-        for root, _, files in os.walk(directory):
-            for fname in files:
-                if fname.lower().endswith(".txt"):
-                    txt_files.append(Path(root) / fname)
+        jobs = [
+            (fpath, fpath.name, self.process_file, (str(fpath), str(output_dir), num_questions, batch_size))
+            for fpath in txt_files
+        ]
+        return self._run_jobs(jobs, max_file_concurrency)
+    
+    def _process_zip(
+        self,
+        zip_path: Path,
+        output_dir: Path,
+        num_questions: int,
+        batch_size: int,
+        max_file_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Process all TXT members of a ZIP archive without extracting it."""
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            members = [
+                info for info in zip_ref.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(".txt")
+            ]
+            
+            # ZipFile.open/read on one handle is not thread-safe; members are
+            # small text files, so reading them one at a time costs little
+            zip_lock = threading.Lock()
+            
+            def process_member(info: zipfile.ZipInfo) -> Dict[str, Any]:
+                # TextIOWrapper translates newlines like reading the file from disk
+                with zip_lock, io.TextIOWrapper(zip_ref.open(info), encoding="utf-8") as f:
+                    text = f.read()
+                stem = PurePosixPath(info.filename).stem
+                return self.process_text(text, stem, str(output_dir), num_questions, batch_size)
+            
+            jobs = [
+                (info.filename, PurePosixPath(info.filename).name, process_member, (info,))
+                for info in members
+            ]
+            return self._run_jobs(jobs, max_file_concurrency)
+    
+    def _run_jobs(self, jobs: List[tuple], max_file_concurrency: Optional[int]) -> Dict[str, Any]:
+        """Run (source, name, func, args) jobs concurrently and tally the results."""
+        results = {"processed": 0, "failed": 0, "files": []}
         
-        for fpath in txt_files:
-            try:
-                self.process_file(str(fpath), str(output_dir), num_questions, batch_size)
-                results["processed"] += 1
-                results["files"].append(fpath.name)
-            except Exception as e:
-                print(f"Error processing {fpath}: {e}")
-                results["failed"] += 1
+        # Each file spends its time waiting on the API, so threads overlap them
+        max_workers = max_file_concurrency or self.max_concurrent_files
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(func, *args): (source, name)
+                for source, name, func, args in jobs
+            }
+            for future in as_completed(futures):
+                source, name = futures[future]
+                try:
+                    future.result()
+                    results["processed"] += 1
+                    results["files"].append(name)
+                except Exception as e:
+                    print(f"Error processing {source}: {e}")
+                    results["failed"] += 1
         
         return results
 
@@ -376,13 +707,18 @@ if __name__ == "__main__":
     parser.add_argument("--input", required=True, help="Path to .txt/.zip file or folder.")
     parser.add_argument("--output", required=True, help="Directory to store generated Q&A files.")
     parser.add_argument("--num-questions", type=int, default=300, help="Number of questions per file")
+    parser.add_argument("--max-files", type=int, default=None, help="Files processed at once (default: 4)")
+    parser.add_argument("--rpm", type=int, default=10, help="Max API requests per minute, 0 = unlimited (default: 10)")
+    parser.add_argument("--tpm", type=int, default=250_000, help="Max prompt tokens per minute, 0 = unlimited (default: 250000)")
     args = parser.parse_args()
     
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    pipeline = QnAPipeline()
-    results = pipeline.process_input(Path(args.input), output_dir, args.num_questions)
+    pipeline = QnAPipeline(rpm=args.rpm, tpm=args.tpm)
+    results = pipeline.process_input(
+        Path(args.input), output_dir, args.num_questions, max_file_concurrency=args.max_files
+    )
     
     print(f"\n🎉 Q&A Generation Complete!")
     print(f"✅ Processed: {results['processed']}, Failed: {results['failed']}")
@@ -1,15 +1,26 @@
 # Set Indic NLP Resources Path
 import argparse
+import functools
+import io
+import mmap
 import os
 import re
-import shutil
 import sys
-import tempfile
 import zipfile
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
 
 from indicnlp import common
 
+# Patterns used per line/file, compiled once
+_QUOTED_STRING = re.compile(r'["\'](.*?)["\']')
+# Single-line LaTeX spans: `code`, $$display$$ and $inline$. One alternation
+# so the text is scanned once; the leftmost span wins.
+_LATEX_SPAN = re.compile(r'`[^\n]*?`|\$\$[^\n]*?\$\$|\$[^\n\$]+\$')
+_TABLE_SEPARATOR = re.compile(r'^[\s\|\-\:]+$')
+_PAREN_ENGLISH = re.compile(r'\([a-zA-Z]+\)')
+_EXTRA_NEWLINES = re.compile(r'\n{3,}')
+
 # --- CONFIGURATION ---
 # 1. Resources Path
 INDIC_NLP_RESOURCES = r"D:/codes/IndusNLPToolkit/IndusNLPToolkit/IndusNLPToolkit/indic_nlp_resources"
@@ -25,6 +36,7 @@ common.set_resources_path(INDIC_NLP_RESOURCES)
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from indusnlp import TextCleaner, HindiTextCleaner
+from indusnlp.pipelines.cleaning import trie_pattern
 
 # Initialize Cleaners
 config = [
@@ -42,7 +54,7 @@ def load_bad_words_set():
     try:
         with open(BAD_WORDS_PATH, 'r', encoding='utf-8') as f:
             content = f.read()
-            matches = re.findall(r'["\'](.*?)["\']', content)
+            matches = _QUOTED_STRING.findall(content)
             for w in matches:
                 if len(w.strip()) > 1: 
                     b_set.add(w.strip().lower())
@@ -54,30 +66,46 @@ def load_bad_words_set():
 
 BAD_WORDS_SET = load_bad_words_set()
 
+# All bad words in one trie-shaped regex, so each line is scanned once
+# instead of once per word.
+BAD_WORDS_RE = re.compile(trie_pattern(BAD_WORDS_SET)) if BAD_WORDS_SET else None
+
 def check_bad_word(text):
     """
     Checks if the text contains any bad word phrase from the list.
     Supports multi-word phrases (e.g., 'bad word').
     """
-    if not BAD_WORDS_SET: return False
-    
-    # Normalize text for checking (lowercase)
-    text_lower = text.lower()
+    if BAD_WORDS_RE is None: return False
     
-    # Iterate through every bad word in our list
-    for bad_word in BAD_WORDS_SET:
-        # Check if the bad word phrase exists anywhere in this line
-        # We add spaces around to ensure we don't match inside other words
-        # (e.g. prevent "ass" matching "assembly"), but we check the raw word too
-        # to be safe for Hindi.
-        
-        if bad_word in text_lower:
-            print(f"   ⚠️  FILTERED: Found '{bad_word}' in line: {text[:30]}...")
-            return True
+    # Normalize text for checking (lowercase). Like the plain substring
+    # check, this also matches inside longer words, which is needed for Hindi.
+    match = BAD_WORDS_RE.search(text.lower())
+    if match:
+        print(f"   ⚠️  FILTERED: Found '{match.group(0)}' in line: {text[:30]}...")
+        return True
             
     return False
 
 
+# Line cleaning is deterministic, and textbooks repeat the same headers,
+# footers and short lines across pages and files, so results are memoized.
+@functools.lru_cache(maxsize=200_000)
+def _clean_latex_line(line):
+    """Safe clean for a line holding LaTeX placeholders."""
+    cleaned_line = line.replace('$', '')
+    cleaned_line = _PAREN_ENGLISH.sub('', cleaned_line)
+    return textcleaner(cleaned_line)
+
+
+@functools.lru_cache(maxsize=200_000)
+def _clean_normal_line(line):
+    """Full clean (text + Hindi cleaner) for a prose line."""
+    cleaned_line = line.replace('$', '')
+    cleaned_line = _PAREN_ENGLISH.sub('', cleaned_line)
+    cleaned_line = textcleaner(cleaned_line)
+    return hicleaner(cleaned_line)
+
+
 def master_cleaning_pipeline(text):
     if not text: return ""
 
@@ -91,9 +119,7 @@ def master_cleaning_pipeline(text):
         latex_counter += 1
         return placeholder
     
-    text = re.sub(r'(`[^\n]*?`)', protect_latex, text)
-    text = re.sub(r'(\$\$[^\n]*?\$\$)', protect_latex, text)
-    text = re.sub(r'(\$[^\n\$]+\$)', protect_latex, text)
+    text = _LATEX_SPAN.sub(protect_latex, text)
 
     # --- STEP 2: SMART LINE-BY-LINE PROCESSING ---
     lines = text.split('\n')
@@ -103,7 +129,9 @@ def master_cleaning_pipeline(text):
         stripped = line.strip()
 
         # 2a. Identify Table lines
-        is_separator = re.match(r'^[\s\|\-\:]+$', stripped) and '|' in stripped and '-' in stripped
+        # Substring checks first: they rule out ordinary prose without
+        # starting the regex engine.
+        is_separator = '|' in stripped and '-' in stripped and _TABLE_SEPARATOR.match(stripped)
         is_table_row = stripped.startswith('|') and stripped.endswith('|')
         
         # 2b. Identify LaTeX lines
@@ -115,10 +143,7 @@ def master_cleaning_pipeline(text):
         
         elif has_latex:
             # LATEX: Safe clean only
-            cleaned_line = line.replace('$', '') 
-            cleaned_line = re.sub(r'\([a-zA-Z]+\)', '', cleaned_line)
-            cleaned_line = textcleaner(cleaned_line)
-            final_cleaned_lines.append(cleaned_line)
+            final_cleaned_lines.append(_clean_latex_line(line))
         
         else:
             # NORMAL TEXT
@@ -127,13 +152,8 @@ def master_cleaning_pipeline(text):
             if check_bad_word(line):
                 continue # Skip this line entirely
             
-            # Normal Cleaning
-            cleaned_line = line.replace('$', '') 
-            cleaned_line = re.sub(r'\([a-zA-Z]+\)', '', cleaned_line)
-            cleaned_line = textcleaner(cleaned_line)
-            
-            # Hicleaner
-            cleaned_line = hicleaner(cleaned_line) 
+            # Normal Cleaning + Hicleaner
+            cleaned_line = _clean_normal_line(line)
             
             if cleaned_line and cleaned_line.strip():
                 final_cleaned_lines.append(cleaned_line)
@@ -144,7 +164,7 @@ def master_cleaning_pipeline(text):
     for placeholder, original_latex in latex_map.items():
         text = text.replace(placeholder, original_latex)
 
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _EXTRA_NEWLINES.sub('\n\n', text)
     return text.strip()
 
 
@@ -152,11 +172,10 @@ def _gather_text_files(input_path: Path, output_path: Path):
     input_path = input_path.resolve()
     output_path = output_path.resolve()
     jobs = []
-    temp_dirs = []
 
     if not input_path.exists():
         print(f"⚠️ Input path not found: {input_path}")
-        return jobs, temp_dirs
+        return jobs
 
     if input_path.is_file():
         suffix = input_path.suffix.lower()
@@ -164,20 +183,17 @@ def _gather_text_files(input_path: Path, output_path: Path):
             jobs.append((input_path, output_path))
         elif suffix == ".zip":
             zip_stem = input_path.stem
-            extraction_root = Path(tempfile.mkdtemp(prefix="clean_zip_"))
-            temp_dirs.append(extraction_root)
-            target_dir = extraction_root / zip_stem
-            target_dir.mkdir(parents=True, exist_ok=True)
-            with zipfile.ZipFile(input_path, "r") as zip_ref:
-                zip_ref.extractall(target_dir)
-
             zip_output = output_path / zip_stem
             zip_output.mkdir(parents=True, exist_ok=True)
 
-            for txt in sorted(target_dir.rglob("*.txt")):
-                if txt.name.endswith("_cleaned.txt"):
+            # Members are read straight from the archive as (zip, member)
+            # sources, so nothing is extracted to disk.
+            with zipfile.ZipFile(input_path, "r") as zip_ref:
+                members = sorted(zip_ref.namelist())
+            for member in members:
+                if not member.endswith(".txt") or member.endswith("_cleaned.txt"):
                     continue
-                jobs.append((txt, zip_output))
+                jobs.append(((input_path, member), zip_output))
         else:
             print(f"⚠️ Unsupported file type: {input_path}")
     elif input_path.is_dir():
@@ -188,45 +204,76 @@ def _gather_text_files(input_path: Path, output_path: Path):
     else:
         print(f"⚠️ Input path not found: {input_path}")
 
-    return jobs, temp_dirs
+    return jobs
 
 
-def process_files(input_path: Path, output_path: Path):
-    jobs, temp_dirs = _gather_text_files(input_path, output_path)
+# Files at least this large are decoded straight from a memory map
+_MMAP_MIN_BYTES = 64 * 1024 * 1024
 
-    if not jobs:
-        print("⚠️ No .txt files found to process.")
+
+def _read_text(source):
+    """Read a job's text; large files on disk are decoded from a memory map."""
+    if isinstance(source, tuple):
+        archive, member = source
+        with zipfile.ZipFile(archive, "r") as zip_ref:
+            # TextIOWrapper translates newlines like reading from disk
+            with io.TextIOWrapper(zip_ref.open(member), encoding='utf-8') as f:
+                return f.read()
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            content = f.read().decode('utf-8')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                content = str(mm, 'utf-8')
+    # Normalise newlines as text mode would
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def _clean_one(job):
+    """Read, clean and save one (source, destination_dir) job."""
+    source, destination_dir = job
+    destination_dir.mkdir(parents=True, exist_ok=True)
+    filename = PurePosixPath(source[1]).name if isinstance(source, tuple) else source.name
+    print(f"Processing: {filename}...")
+
+    try:
+        file_content = _read_text(source)
+    except Exception as e:
+        print(f"❌ Error reading {filename}: {e}")
         return
 
     try:
-        for source_path, destination_dir in jobs:
-            destination_dir.mkdir(parents=True, exist_ok=True)
-            filename = source_path.name
-            print(f"Processing: {filename}...")
-
-            try:
-                with open(source_path, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-            except Exception as e:
-                print(f"❌ Error reading {filename}: {e}")
-                continue
+        cleaned_text = master_cleaning_pipeline(file_content)
+    except Exception as e:
+        print(f"❌ Error during cleaning {filename}: {e}")
+        return
 
-            try:
-                cleaned_text = master_cleaning_pipeline(file_content)
-            except Exception as e:
-                print(f"❌ Error during cleaning {filename}: {e}")
-                continue
+    cleaned_file = destination_dir / filename.replace(".txt", "_cleaned.txt")
+    try:
+        with open(cleaned_file, 'w', encoding='utf-8') as f:
+            f.write(cleaned_text)
+        print(f"✅ Saved: {cleaned_file}")
+    except Exception as e:
+        print(f"❌ Error writing {cleaned_file}: {e}")
+
+
+def process_files(input_path: Path, output_path: Path, workers=None):
+    jobs = _gather_text_files(input_path, output_path)
+
+    if not jobs:
+        print("⚠️ No .txt files found to process.")
+        return
 
-            cleaned_file = destination_dir / filename.replace(".txt", "_cleaned.txt")
-            try:
-                with open(cleaned_file, 'w', encoding='utf-8') as f:
-                    f.write(cleaned_text)
-                print(f"✅ Saved: {cleaned_file}")
-            except Exception as e:
-                print(f"❌ Error writing {cleaned_file}: {e}")
-    finally:
-        for temp_dir in temp_dirs:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+    if len(jobs) > 1 and workers != 1:
+        # Cleaning is CPU-bound Python, so files go to separate processes.
+        # Each worker imports this script and so builds its own cleaners.
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_clean_one, jobs))
+    else:
+        for job in jobs:
+            _clean_one(job)
 
 
 def process_dataset(folder_path):
@@ -239,6 +286,8 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Run IndusNLP cleaning pipeline.")
     parser.add_argument("--input", help="Path to a .txt file or folder containing .txt files.")
     parser.add_argument("--output", help="Directory where cleaned files will be written.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per CPU; 1 = serial).")
     return parser.parse_args()
 
 
@@ -246,6 +295,6 @@ if __name__ == '__main__':
     args = parse_args()
 
     if args.input and args.output:
-        process_files(Path(args.input), Path(args.output))
+        process_files(Path(args.input), Path(args.output), args.workers)
     else:
         process_dataset(FOLDER_NAME)
@@ -2,10 +2,13 @@
 # 📄 OCR Processing: PDF Files and ZIP Archives
 # ============================================================
 import argparse
+import hashlib
 import os
 import zipfile
 import tempfile
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from mistralai import Mistral
 from dotenv import load_dotenv
@@ -17,6 +20,22 @@ api_key = "fCx1qVhbannccU1UNZMnISojbnE3iZeA"
 
 client = Mistral(api_key=api_key)
 
+# PDFs are OCR'd concurrently; errors.txt appends must not interleave
+_error_log_lock = threading.Lock()
+
+# Content digest -> .txt already written for it, so duplicate PDFs (the same
+# chapter under another name) are copied instead of uploaded and OCR'd again
+_OCR_CACHE = {}
+
+
+def file_digest(path):
+    """BLAKE2b digest of a file's content, read in 1 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
 
 # ============================================================
 # Helper: get all PDF file paths recursively
@@ -56,6 +75,13 @@ def process_pdf(pdf_path: str, output_dir: Path, base_dir: Path = None):
         
         txt_path.parent.mkdir(parents=True, exist_ok=True)
 
+        digest = file_digest(pdf_path)
+        cached_txt = _OCR_CACHE.get(digest)
+        if cached_txt is not None and cached_txt.exists():
+            shutil.copyfile(cached_txt, txt_path)
+            print(f"✅ Saved (duplicate of {cached_txt.name}): {txt_path}\n")
+            return True
+
         # Upload file to Mistral
         with open(pdf_path, "rb") as f:
             uploaded_file = client.files.upload(
@@ -85,13 +111,14 @@ def process_pdf(pdf_path: str, output_dir: Path, base_dir: Path = None):
                 page_text = getattr(page, "markdown", "") or getattr(page, "text", "")
                 f.write(f"\n{page_text.strip()}\n")
 
+        _OCR_CACHE[digest] = txt_path
         print(f"✅ Saved: {txt_path}\n")
         return True
 
     except Exception as e:
         print(f"❌ Error processing {pdf_path}: {e}")
         error_path = output_dir / "errors.txt"
-        with open(error_path, "a", encoding="utf-8") as ef:
+        with _error_log_lock, open(error_path, "a", encoding="utf-8") as ef:
             ef.write(f"[ERROR processing {pdf_path}: {e}]\n")
         return False
 
@@ -99,8 +126,12 @@ def process_pdf(pdf_path: str, output_dir: Path, base_dir: Path = None):
 # ============================================================
 # Process directory containing PDFs
 # ============================================================
-def process_directory(directory: Path, output_dir: Path):
-    """Process all PDF files in a directory recursively."""
+def process_directory(directory: Path, output_dir: Path, workers: int = 8):
+    """Process all PDF files in a directory recursively.
+
+    Each PDF is an upload -> signed URL -> OCR round-trip that mostly waits
+    on the network, so up to `workers` PDFs are processed at once.
+    """
     pdf_files = get_all_pdfs(str(directory))
     
     if not pdf_files:
@@ -109,15 +140,18 @@ def process_directory(directory: Path, output_dir: Path):
     
     print(f"Found {len(pdf_files)} PDF files in '{directory}'\n")
     
-    for idx, pdf_path in enumerate(pdf_files, start=1):
+    def run(idx, pdf_path):
         print(f"📄 [{idx}/{len(pdf_files)}] Processing: {pdf_path}")
-        process_pdf(pdf_path, output_dir, base_dir=directory)
+        return process_pdf(pdf_path, output_dir, base_dir=directory)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run, range(1, len(pdf_files) + 1), pdf_files))
 
 
 # ============================================================
 # Handle input path (file, directory, or ZIP)
 # ============================================================
-def handle_input_path(input_path: Path, output_dir: Path):
+def handle_input_path(input_path: Path, output_dir: Path, workers: int = 8):
     """Handle different input types: PDF file, ZIP file, or directory."""
     temp_dir = None
 
@@ -141,13 +175,13 @@ def handle_input_path(input_path: Path, output_dir: Path):
                 
                 target_output = output_dir / zip_stem
                 target_output.mkdir(parents=True, exist_ok=True)
-                process_directory(extract_dir, target_output)
+                process_directory(extract_dir, target_output, workers)
             else:
                 print(f"⚠️ Unsupported file type: {input_path}. Expected .pdf or .zip")
         elif input_path.is_dir():
             # Directory containing PDFs
             output_dir.mkdir(parents=True, exist_ok=True)
-            process_directory(input_path, output_dir)
+            process_directory(input_path, output_dir, workers)
         else:
             print(f"⚠️ Input path not found: {input_path}")
     finally:
@@ -162,6 +196,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="OCR processing for PDF files and ZIP archives.")
     parser.add_argument("--input", required=True, help="Path to .pdf/.zip file or folder containing PDFs.")
     parser.add_argument("--output", required=True, help="Directory to store OCR output .txt files.")
+    parser.add_argument("--workers", type=int, default=8, help="PDFs processed at once (default: 8).")
     return parser.parse_args()
 
 
@@ -175,5 +210,5 @@ if __name__ == "__main__":
         print(f"❌ Input path does not exist: {input_path}")
         exit(1)
     
-    handle_input_path(input_path, output_dir)
+    handle_input_path(input_path, output_dir, args.workers)
     print(f"\n🎉 All OCR text files saved under '{output_dir}/'")
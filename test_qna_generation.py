@@ -5,18 +5,34 @@
 """
 
 import argparse
+import asyncio
+import functools
 import os
 import json
 import re
-import time
 import math
+import random
+import unicodedata
+from datetime import timedelta
 import zipfile
 import tempfile
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 import google.generativeai as genai
 from dotenv import load_dotenv
+from google.api_core import exceptions as google_exceptions
+
+try:
+    import orjson  # optional: much faster JSON parser/writer
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so the except
+# clauses below handle either parser
+json_loads = orjson.loads if orjson is not None else json.loads
 
 load_dotenv()
 
@@ -26,118 +42,378 @@ if not API_KEY:
     raise ValueError("GEMINI_API_KEY not configured. Set it in environment variables.")
     
 genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel("gemini-2.5-flash")
+MODEL_NAME = "gemini-2.5-flash"
+model = genai.GenerativeModel(MODEL_NAME)
+
+# Explicit context caching of instructions + chunk (--context-cache)
+USE_CONTEXT_CACHE = False
+CONTEXT_CACHE_TTL = timedelta(minutes=15)
+
+# ============================================================
+# ⏱️ Rate limiting (RPM + TPM)
+# ============================================================
+class AsyncRateLimiter:
+    """Delay calls so they stay under requests- and tokens-per-minute quotas.
+
+    Requests get one slot every 60/rpm seconds. Tokens come from a bucket
+    that refills at tpm/60 per second and may go into debt; a call that
+    overdraws it waits until the debt is repaid. A limit of 0 disables it.
+    """
+
+    def __init__(self, rpm: int = 10, tpm: int = 250_000):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self.tpm = tpm
+        self.tokens = float(tpm)
+        self.next_slot = 0.0
+        self.updated = None
+
+    async def acquire(self, est_tokens: int = 0) -> None:
+        now = asyncio.get_running_loop().time()
+        # Reserve the slot before sleeping, so concurrent callers queue up
+        start = max(now, self.next_slot)
+        self.next_slot = start + self.interval
+        if self.tpm:
+            if self.updated is not None:
+                self.tokens = min(self.tpm, self.tokens + (now - self.updated) * self.tpm / 60)
+            self.updated = now
+            self.tokens -= min(est_tokens, self.tpm)
+            if self.tokens < 0:
+                start = max(start, now - self.tokens * 60 / self.tpm)
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+# Gemini 2.5 Flash free-tier quotas; overridden by --rpm/--tpm
+rate_limiter = AsyncRateLimiter()
 
 # ============================================================
 # 🧹 FIXED JSON Cleaning (Production-grade)
 # ============================================================
+_TRAILING_COMMA_RE = re.compile(r",(\s*[\]}])")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def question_key(question: str) -> str:
+    """Duplicate-filter key: casefolded, Unicode punctuation (P*: "?", quotes,
+    dandas) turned into spaces, whitespace collapsed. Symbols like "+", "×"
+    and "<" are kept, since they change what a question asks."""
+    category = unicodedata.category
+    return " ".join(
+        "".join(" " if category(ch)[0] == "P" else ch for ch in question.casefold()).split()
+    )
+
+
+def salvage_json_items(text: str) -> List[Dict]:
+    """Decode the objects of a JSON array one by one, stopping at the first
+    that does not parse.
+
+    Keeps the complete items of a response cut off mid-array (max output
+    tokens) or broken further on, instead of losing the whole batch; commas
+    between and after items are skipped, so trailing commas need no fix-up.
+    """
+    items: List[Dict] = []
+    pos, end = 1, len(text)  # text[0] is the opening "["
+    while pos < end:
+        while pos < end and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= end or text[pos] == "]":
+            break
+        try:
+            item, pos = _JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        if isinstance(item, dict):
+            items.append(item)
+    return items
+
+
 def clean_json(raw: str) -> Optional[List[Dict]]:
     """Clean and parse JSON from Gemini response."""
     if not raw:
         return None
     
-    # FIXED: Robust regex for ALL code fences
-    raw = re.sub(r"```
-    start, end = raw.find("["), raw.rfind("]") + 1
-    if start == -1 or end <= 0:
+    # Any ```json fence sits outside the brackets, so locating the array
+    # skips it without a separate pass over the text
+    start = raw.find("[")
+    if start == -1:
         return None
     
-    text = raw[start:end].strip()
-    
     # FIXED: Smart quote normalization + robust parsing
-    text = text.replace("“", '"').replace("”", '"').replace("‘", "'").replace("'", "'")
+    # Chained replace() rather than str.translate: translate has no fast path
+    # for non-ASCII text and is ~100x slower on Devanagari responses, while
+    # each replace() is a C-level search that copies only on a hit.
+    text = raw[start:].replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
     
-    try:
-        data = json.loads(text)
-        return data if isinstance(data, list) else None
-    except json.JSONDecodeError:
-        # Conservative cleanup for trailing commas
+    end = text.rfind("]") + 1
+    if end > 0:
         try:
-            cleaned = re.sub(r",(\s*[\]}])", r"\1", text)
-            data = json.loads(cleaned)
-            return data if isinstance(data, list) else None
+            data = json_loads(text[:end])
+            # Only objects are Q&A items; the filter below calls item.get()
+            return [item for item in data if isinstance(item, dict)] if isinstance(data, list) else None
         except json.JSONDecodeError:
-            return None
+            pass
+    
+    # Slow path, for malformed or truncated output only: drop trailing commas
+    # inside items too, then keep every item that still decodes
+    return salvage_json_items(_TRAILING_COMMA_RE.sub(r"\1", text)) or None
 
 # ============================================================
-# 🤖 FIXED Batch Generation (Production-grade)
+# 🧠 Prompt
 # ============================================================
-def generate_detailed_qna(text: str, seen: set) -> Optional[List[Dict]]:
-    """Generate a single batch of Q&A pairs."""
-    prompt = f"""
-You are an expert educational AI that generates *detailed, high-quality academic Q&A*.
-
-🎯 TASK:
-Generate 25 **unique** and **non-repetitive** Question–Answer pairs from the given Hindi or bilingual NCERT text.
-
-Distribute evenly among these 5 types:
-1️⃣ Multiple Choice Questions (MCQs)
-2️⃣ Objective Questions (True/False, Fill in the Blanks, Match the Following)
-3️⃣ Summarization Questions
-4️⃣ Chain of Thought Questions
-5️⃣ Logical Reasoning Questions
-
-⚙️ OUTPUT RULES:
-- Return a **valid JSON array only**, no markdown, no text.
-- Each object must follow one of these schemas:
-
-🅰️ For MCQs:
-{{
-  "type": "MCQ",
-  "question": "string (Hindi or bilingual)",
-  "options": ["Option A", "Option B", "Option C", "Option D"],
-  "correct_answer": "string (exactly one of the options)",
-  "explanation": "3–6 sentence explanation"
-}}
-
-📘 For other types:
-{{
-  "type": "Objective" | "Summarization" | "Chain of Thought" | "Logical Reasoning",
-  "question": "string",
-  "answer": "detailed 4–8 sentence answer"
-}}
-
-⚠️ RULES:
+# Static instructions: identical for every batch of a run, so they form the
+# shared prefix that implicit (or explicit, see --context-cache) caching can
+# reuse. {count} and {per_type} are filled in by qna_instructions().
+QNA_INSTRUCTIONS = """
+You are an expert educational AI that generates detailed, high-quality academic Q&A.
+
+TASK:
+Generate {count} unique, non-repetitive Question–Answer pairs from the given Hindi or bilingual NCERT text,
+distributed evenly among these 5 types (about {per_type} of each):
+1. Multiple Choice Questions (MCQs)
+2. Objective Questions (True/False, Fill in the Blanks, Match the Following)
+3. Summarization Questions
+4. Chain of Thought Questions
+5. Logical Reasoning Questions
+
+OUTPUT: a valid JSON array only (no markdown, no text). Each object follows one of these schemas:
+MCQ: {"type": "MCQ", "question": "string (Hindi or bilingual)", "options": ["Option A", "Option B", "Option C", "Option D"], "correct_answer": "string (exactly one of the options)", "explanation": "3–6 sentence explanation"}
+Other types: {"type": "Objective" | "Summarization" | "Chain of Thought" | "Logical Reasoning", "question": "string", "answer": "detailed 4–8 sentence answer"}
+
+RULES:
 - Avoid exact duplicates.
 - Semantically similar questions allowed if explanations differ.
 - Maintain conceptual variety.
-- Output clean JSON only.
-
-Text:
-{text[:7000]}
 """
+
+# Output cap per call: ~400 tokens per detailed Q&A, plus headroom for the
+# thinking tokens 2.5 models count against the limit. It stops a runaway
+# response early instead of decoding to the model max.
+OUTPUT_TOKENS_PER_QA = 400
+THINKING_TOKENS = 4096
+MAX_OUTPUT_TOKENS = 65536  # gemini-2.5-flash ceiling
+
+# Sent alone when the instructions and text live in a cached context
+CACHED_PROMPT = "Generate the Q&A pairs for the text above, following the instructions."
+
+
+@functools.lru_cache(maxsize=None)
+def qna_instructions(count: int) -> str:
+    # str.replace, not str.format: the schemas are full of literal braces
+    return (QNA_INSTRUCTIONS.replace("{count}", str(count))
+            .replace("{per_type}", str(max(1, round(count / 5)))))
+
+
+@functools.lru_cache(maxsize=None)
+def prompt_prefix(count: int) -> str:
+    return f"{qna_instructions(count)}\nText:\n"
+
+
+def build_prompt(text: str, count: int) -> str:
+    # Only the text varies per batch; the prefix is built once per count
+    return prompt_prefix(count) + text[:7000] + "\n"
+
+
+# ============================================================
+# 🤖 FIXED Batch Generation (Production-grade)
+# ============================================================
+async def generate_detailed_qna(text: str, seen: set, count: int = 25, cached_model=None) -> Optional[List[Dict]]:
+    """Generate a single batch of Q&A pairs.
+
+    With `cached_model` (bound to a CachedContent holding the instructions
+    and `text`) only the short trailing request is sent.
+    """
+    prompt = build_prompt(text, count)
     
     try:
-        response = model.generate_content(
-            prompt,
+        # Wait for quota instead of provoking 429s (~4 chars per token)
+        await rate_limiter.acquire(est_tokens=len(prompt) // 4)
+        
+        # Native async call; the whole script runs on one event loop
+        response = await (cached_model or model).generate_content_async(
+            CACHED_PROMPT if cached_model else prompt,
             generation_config=genai.types.GenerationConfig(
                 response_mime_type="application/json",
                 temperature=0.5,
                 top_p=0.95,
                 top_k=40,
+                max_output_tokens=min(MAX_OUTPUT_TOKENS, THINKING_TOKENS + count * OUTPUT_TOKENS_PER_QA),
             ),
         )
         
         # FIXED: Robust response access
         raw = getattr(response, "text", None)
-        if raw is None and hasattr(response, "candidates") and response.candidates:
+        if raw is None and getattr(response, "candidates", None):
             try:
-                raw = response.candidates.content.parts.text
+                raw = response.candidates[0].content.parts[0].text
             except (IndexError, AttributeError):
-                raw = ""
-        else:
-            raw = ""
+                raw = None
         
-        return clean_json(raw)
+        return clean_json(raw or "")
+    except google_exceptions.GoogleAPICallError:
+        raise  # classified (and retried or not) by generate_batch
     except Exception as e:
         print(f"⚠️ Gemini error: {e}")
         return None
 
+# ============================================================
+# 🔁 Backoff (exponential + jitter, keyed on error class)
+# ============================================================
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0       # seconds before the first retry
+BACKOFF_MAX = 60.0
+BACKOFF_JITTER = 1.0
+RATE_LIMIT_BASE = 10.0   # 429s need a longer first wait than transient 5xx
+
+# Server-side, transient: worth retrying
+RETRYABLE_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE) -> float:
+    """Capped exponential delay for the given (1-based) attempt, plus jitter."""
+    return min(BACKOFF_MAX, base * 2 ** (attempt - 1)) + random.uniform(0, BACKOFF_JITTER)
+
+
+def server_retry_delay(error: Exception) -> float:
+    """Retry delay suggested by a quota error's RetryInfo detail, if any."""
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is not None:
+            return retry_delay.seconds + retry_delay.nanos / 1e9
+    return 0.0
+
+# ============================================================
+# 🔁 Batch with retries (bounded concurrency)
+# ============================================================
+async def generate_batch(batch: int, chunk_text: str, seen: set, semaphore: asyncio.Semaphore,
+                         count: int = 25, cached_model=None) -> Optional[List[Dict]]:
+    """Generate one batch, retrying with exponential backoff, under the semaphore."""
+    async with semaphore:
+        print(f"⚙️ Batch {batch} ...")
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                qna_data = await generate_detailed_qna(chunk_text, seen, count, cached_model)
+                if qna_data:
+                    return qna_data
+                delay = backoff_delay(attempt)  # unusable response
+            except google_exceptions.ResourceExhausted as e:
+                # Quota: wait at least as long as the server asks
+                print(f"⚠️ Rate limited on batch {batch}: {e}")
+                delay = max(backoff_delay(attempt, RATE_LIMIT_BASE), server_retry_delay(e))
+            except RETRYABLE_ERRORS as e:
+                print(f"⚠️ Gemini server error on batch {batch}: {e}")
+                delay = backoff_delay(attempt)
+            except google_exceptions.GoogleAPICallError as e:
+                # Bad request, auth, ...: retrying cannot help
+                print(f"❌ Gemini error on batch {batch}, not retrying: {e}")
+                return None
+            if attempt < MAX_ATTEMPTS:
+                print(f"⚠️ Retry {attempt}/{MAX_ATTEMPTS - 1} for batch {batch} in {delay:.1f}s ...")
+                await asyncio.sleep(delay)
+    print(f"❌ Skipping batch {batch} after {MAX_ATTEMPTS - 1} retries")
+    return None
+
+# ============================================================
+# 💾 Output encoding
+# ============================================================
+def count_existing_qna(output_json: str) -> int:
+    """Items in a previous run's JSON output, or 0 if missing/unreadable.
+
+    Outputs are only moved into place once complete, so a present file is a
+    finished one.
+    """
+    try:
+        if orjson is not None:
+            with open(output_json, "rb") as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(output_json, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    return len(data) if isinstance(data, list) else 0
+
+
+def encode_json_item(item: Dict) -> bytes:
+    """One array element, laid out exactly as json.dump(..., indent=2) of the
+    whole list would (JSON strings never hold a raw newline)."""
+    if orjson is not None:
+        data = orjson.dumps(item, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+    return b"  " + data.replace(b"\n", b"\n  ")
+
+
+# ============================================================
+# 🗄️ Context caching
+# ============================================================
+async def create_context_caches(chunks: List[str], num_batches: int, count: int) -> List[Optional[Any]]:
+    """Cache instructions + text for each chunk that several batches reuse.
+
+    Returns one CachedContent (or None) per chunk. Creation fails when the
+    content is below the model's minimum cacheable size; those chunks just
+    fall back to sending the full prompt.
+    """
+    caches: List[Optional[Any]] = []
+    for idx, chunk_text in enumerate(chunks):
+        if num_batches <= len(chunks) or not chunk_text.strip():
+            caches.append(None)  # used at most once: caching costs more than it saves
+            continue
+        try:
+            cache = await asyncio.to_thread(
+                genai.caching.CachedContent.create,
+                model=f"models/{MODEL_NAME}",
+                system_instruction=qna_instructions(count),
+                contents=[f"Text:\n{chunk_text[:7000]}"],
+                ttl=CONTEXT_CACHE_TTL,
+            )
+            caches.append(cache)
+        except Exception as e:
+            print(f"⚠️ Context cache unavailable for chunk {idx + 1}: {e}")
+            caches.append(None)
+    return caches
+
+
+async def delete_context_caches(caches: List[Optional[Any]]) -> None:
+    for cache in caches:
+        if cache is None:
+            continue
+        try:
+            await asyncio.to_thread(cache.delete)
+        except Exception as e:
+            print(f"⚠️ Failed to delete context cache {cache.name}: {e}")
+
 # ============================================================
 # 🚀 FIXED Single File Processing (Production-grade)
 # ============================================================
-def process_file(filepath: str, output_dir: str, num_questions: int = 300, batch_size: int = 25) -> Dict[str, Any]:
-    """Process a single text file and generate Q&A."""
+async def process_file(filepath: str, output_dir: str, num_questions: int = 300, batch_size: int = 25,
+                       concurrency: int = 8, force: bool = False) -> Dict[str, Any]:
+    """Process a single text file and generate Q&A.
+
+    Batches are independent API calls, so up to `concurrency` run at once;
+    results are de-duplicated afterwards in batch order. A file whose JSON
+    output already holds `num_questions` items is skipped unless `force`.
+    """
+    base_name = Path(filepath).stem
+    out_dir = Path(output_dir)
+    output_txt = str(out_dir / f"{base_name}_{num_questions}_QA.txt")
+    output_json = str(out_dir / f"{base_name}_{num_questions}_QA.json")
+    
+    if not force:
+        done = count_existing_qna(output_json)
+        if done >= num_questions and os.path.exists(output_txt):
+            print(f"⏭️ Already done: {base_name} ({done} Q&A in {output_json})")
+            return {
+                "success": True,
+                "skipped": True,
+                "num_questions": done,
+                "output_txt": output_txt,
+                "output_json": output_json
+            }
+    
     try:
         with open(filepath, "r", encoding="utf-8") as f:
             text = f.read().strip()
@@ -153,75 +429,89 @@ def process_file(filepath: str, output_dir: str, num_questions: int = 300, batch
     if chunk_size == 0:
         chunk_size = 1
     
-    base_name = os.path.splitext(os.path.basename(filepath))
-    os.makedirs(output_dir, exist_ok=True)
-    output_txt = os.path.join(output_dir, f"{base_name}_{num_questions}_QA.txt")
-    output_json = os.path.join(output_dir, f"{base_name}_{num_questions}_QA.json")
+    out_dir.mkdir(parents=True, exist_ok=True)
     
-    all_qna: List[Dict] = []
     seen: set = set()
     num_batches = math.ceil(num_questions / batch_size)
     
+    # Cut consecutive chunks once (no more than there are batches) and
+    # reuse them round-robin when the text is shorter than all batches need
+    chunks = [text[start:start + chunk_size] for start in range(0, min(text_len, num_batches * chunk_size), chunk_size)]
+    
     print(f"\n🧠 Generating {num_questions} questions for: {base_name} ({text_len} chars)")
     
+    caches = await create_context_caches(chunks, num_batches, batch_size) if USE_CONTEXT_CACHE else [None] * len(chunks)
+    cached_models = [genai.GenerativeModel.from_cached_content(cache) if cache else None for cache in caches]
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
     for batch in range(1, num_batches + 1):
-        print(f"⚙️ Batch {batch}/{num_batches} ...")
-        
-        start = ((batch - 1) * chunk_size) % text_len
-        chunk_text = text[start:start + chunk_size]
-        
+        idx = (batch - 1) % len(chunks)
+        chunk_text = chunks[idx]
         if not chunk_text.strip():
             print(f"⚠️ Empty chunk, skipping batch {batch}")
             continue
-        
-        qna_data = None
-        for attempt in range(1, 4):  # FIXED: Exponential backoff
-            qna_data = generate_detailed_qna(chunk_text, seen)
-            if qna_data:
-                break
-            print(f"⚠️ Retry {attempt}/3 for batch {batch} ...")
-            time.sleep(2 ** attempt)
-        
-        if not qna_data:
-            print(f"❌ Skipping batch {batch} after 3 retries")
-            continue
-        
-        # Filter duplicates
-        new_items = []
-        for item in qna_data:
-            q = (item.get("question") or "").strip()
-            if not q:
-                continue
-            q_norm = re.sub(r'\s+', ' ', q.lower())
-            if q_norm not in seen:
-                seen.add(q_norm)
-                new_items.append(item)
-        
-        all_qna.extend(new_items)
-        print(f"✅ Added {len(new_items)} new (Total: {len(all_qna)}/{num_questions})")
-        
-        if len(all_qna) >= num_questions:
-            break
-        
-        time.sleep(1)  # Rate limiting
+        tasks.append(asyncio.create_task(generate_batch(batch, chunk_text, seen, semaphore, batch_size, cached_models[idx])))
     
-    if not all_qna:
-        raise RuntimeError(f"No Q&A generated from {text_len} chars in {filepath}")
-    
-    all_qna = all_qna[:num_questions]
-    
-    # ✨ FORMAT OUTPUT
-    formatted_output = []
-    for i, q in enumerate(all_qna, start=1):
-        question = q.get("question", "")
-        answer = q.get("explanation", q.get("answer", ""))
-        formatted_output.append(f"{i}. {question}\n{answer}\n")
+    # Accepted items go straight to .part files, renamed into place once
+    # complete: nothing is buffered, and a finished output is never partial
+    txt_part = output_txt + ".part"
+    json_part = output_json + ".part"
+    written = 0
+    complete = False
+    try:
+        with open(txt_part, "w", encoding="utf-8", buffering=1 << 20) as txt_f, \
+             open(json_part, "wb", buffering=1 << 20) as json_f:
+            json_f.write(b"[")
+            # Serial pass in batch order: no races on `seen`, same result as a
+            # sequential run, and queued batches are dropped once we have enough
+            for task in tasks:
+                qna_data = await task
+                if not qna_data:
+                    continue
+                
+                # Filter duplicates
+                added = 0
+                for item in qna_data:
+                    q = (item.get("question") or "").strip()
+                    if not q:
+                        continue
+                    q_norm = question_key(q)
+                    if q_norm in seen:
+                        continue
+                    seen.add(q_norm)
+                    written += 1
+                    added += 1
+                    
+                    # ✨ FORMAT OUTPUT (blank line between TXT entries)
+                    question = item.get("question", "")
+                    answer = item.get("explanation", item.get("answer", ""))
+                    txt_f.write(f"{written}. {question}\n{answer}\n" if written == 1 else f"\n{written}. {question}\n{answer}\n")
+                    json_f.write((b"\n" if written == 1 else b",\n") + encode_json_item(item))
+                    if written >= num_questions:
+                        break
+                
+                print(f"✅ Added {added} new (Total: {written}/{num_questions})")
+                
+                if written >= num_questions:
+                    break
+            json_f.write(b"\n]" if written else b"]")
+        complete = written > 0
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await delete_context_caches(caches)
+        if not complete:
+            for part in (txt_part, json_part):
+                if os.path.exists(part):
+                    os.remove(part)
     
-    with open(output_txt, "w", encoding="utf-8") as f:
-        f.write("\n".join(formatted_output))
+    if not written:
+        raise RuntimeError(f"No Q&A generated from {text_len} chars in {filepath}")
     
-    with open(output_json, "w", encoding="utf-8") as f:
-        json.dump(all_qna, f, ensure_ascii=False, indent=2)
+    os.replace(txt_part, output_txt)
+    os.replace(json_part, output_json)
     
     print(f"\n🎉 Done! Saved for {base_name}:")
     print(f"📘 TXT → {output_txt}")
@@ -229,7 +519,7 @@ def process_file(filepath: str, output_dir: str, num_questions: int = 300, batch
     
     return {
         "success": True,
-        "num_questions": len(all_qna),
+        "num_questions": written,
         "input_chars": text_len,
         "output_txt": output_txt,
         "output_json": output_json
@@ -238,34 +528,121 @@ def process_file(filepath: str, output_dir: str, num_questions: int = 300, batch
 # ============================================================
 # 📁 FIXED Directory Processing
 # ============================================================
-def process_directory(directory: Path, output_dir: Path, num_questions: int = 300, batch_size: int = 25):
-    """Process all TXT files in a directory."""
-    txt_files = []
-    for root, _, files in os.walk(directory):
-        for fname in files:
-            if fname.lower().endswith(".txt"):
-                txt_files.append(Path(root) / fname)
+def iter_txt_files(directory) -> Iterator[Path]:
+    """Yield every .txt file under directory, recursively, via os.scandir."""
+    try:
+        entries = os.scandir(directory)
+    except OSError as e:
+        print(f"⚠️ Skipping unreadable directory {directory}: {e}")
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_txt_files(entry.path)
+            elif entry.name.lower().endswith(".txt") and entry.is_file():
+                yield Path(entry.path)
+
+
+def extract_txt_members(zip_path: Path, extract_dir: Path) -> int:
+    """Extract the .txt members of a ZIP, decompressing entries in parallel.
+
+    zlib releases the GIL while inflating, so threads overlap the work of
+    separate members. Each thread opens its own ZipFile handle: ZipFile.open
+    on one shared handle is not thread-safe. Returns the number of files
+    extracted.
+    """
+    root = extract_dir.resolve()
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        jobs = []
+        for info in zip_ref.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".txt"):
+                continue
+            # Sanitise like ZipFile._extract_member: drop drive letters,
+            # root, "." and "..", so a crafted archive cannot write outside
+            # extract_dir (splitdrive per part also catches "a/C:/x.txt")
+            parts = [os.path.splitdrive(p)[1] for p in info.filename.replace("\\", "/").split("/")]
+            parts = [p for p in parts if p not in ("", ".", "..")]
+            if not parts:
+                continue
+            dest = extract_dir.joinpath(*parts)
+            if not dest.resolve().is_relative_to(root):
+                print(f"⚠️ Skipping unsafe ZIP member: {info.filename}")
+                continue
+            jobs.append((info, dest))
+        
+        # Create directories up front so the workers never race on makedirs
+        for parent in {dest.parent for _, dest in jobs}:
+            parent.mkdir(parents=True, exist_ok=True)
+    
+    local = threading.local()
+    handles: List[zipfile.ZipFile] = []
+    handles_lock = threading.Lock()
     
-    print(f"📚 Found {len(txt_files)} .txt files.\n")
+    def extract_one(job) -> None:
+        info, dest = job
+        zf = getattr(local, "zip_ref", None)
+        if zf is None:
+            zf = local.zip_ref = zipfile.ZipFile(zip_path, "r")
+            with handles_lock:
+                handles.append(zf)
+        with zf.open(info) as src, open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+    
+    try:
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(extract_one, jobs))
+    finally:
+        for zf in handles:
+            zf.close()
     
+    return len(jobs)
+
+
+async def process_directory(directory: Path, output_dir: Path, num_questions: int = 300, batch_size: int = 25,
+                            concurrency: int = 8, max_files: int = 4, force: bool = False):
+    """Process all TXT files in a directory, up to `max_files` at a time.
+
+    Files are queued as the directory walk finds them, so the first API
+    calls go out before discovery has finished. Files only share the
+    module-level rate limiter; de-duplication stays per file.
+    """
+    workers = max(1, max_files)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
     processed = 0
     failed = 0
     
-    for fpath in txt_files:
-        try:
-            process_file(str(fpath), str(output_dir), num_questions, batch_size)
-            processed += 1
-            print(f"✅ {fpath.name}")
-        except Exception as e:
-            print(f"❌ {fpath.name}: {e}")
-            failed += 1
+    async def worker() -> None:
+        nonlocal processed, failed
+        while (fpath := await queue.get()) is not None:
+            try:
+                await process_file(str(fpath), str(output_dir), num_questions, batch_size, concurrency, force)
+                print(f"✅ {fpath.name}")
+                processed += 1
+            except Exception as e:
+                print(f"❌ {fpath.name}: {e}")
+                failed += 1
+    
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    try:
+        found = 0
+        for fpath in iter_txt_files(directory):
+            found += 1
+            await queue.put(fpath)  # blocks while all workers are busy
+        for _ in tasks:
+            await queue.put(None)
+        print(f"📚 Found {found} .txt files.\n")
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
     
     print(f"\n📊 SUMMARY: {processed} processed, {failed} failed")
 
 # ============================================================
 # 🚀 MAIN Handler (Production-grade)
 # ============================================================
-def handle_input_path(input_path: Path, output_dir: Path, num_questions: int = 300, batch_size: int = 25):
+async def handle_input_path(input_path: Path, output_dir: Path, num_questions: int = 300, batch_size: int = 25,
+                            concurrency: int = 8, max_files: int = 4, force: bool = False):
     """Handle TXT, ZIP, or directory input."""
     temp_dir = None
     
@@ -276,7 +653,7 @@ def handle_input_path(input_path: Path, output_dir: Path, num_questions: int = 3
         if input_path.is_file():
             suffix = input_path.suffix.lower()
             if suffix == ".txt":
-                process_file(str(input_path), str(output_dir), num_questions, batch_size)
+                await process_file(str(input_path), str(output_dir), num_questions, batch_size, concurrency, force)
             elif suffix == ".zip":
                 print(f"📦 Extracting ZIP: {input_path}")
                 zip_stem = input_path.stem
@@ -284,17 +661,16 @@ def handle_input_path(input_path: Path, output_dir: Path, num_questions: int = 3
                 extract_dir = temp_dir / zip_stem
                 extract_dir.mkdir(parents=True, exist_ok=True)
                 
-                with zipfile.ZipFile(input_path, "r") as zip_ref:
-                    zip_ref.extractall(extract_dir)
+                extract_txt_members(input_path, extract_dir)
                 
                 target_output = output_dir / zip_stem
                 target_output.mkdir(parents=True, exist_ok=True)
-                process_directory(extract_dir, target_output, num_questions, batch_size)
+                await process_directory(extract_dir, target_output, num_questions, batch_size, concurrency, max_files, force)
             else:
                 raise ValueError(f"Unsupported file type: {suffix}. Use .txt or .zip")
                 
         elif input_path.is_dir():
-            process_directory(input_path, output_dir, num_questions, batch_size)
+            await process_directory(input_path, output_dir, num_questions, batch_size, concurrency, max_files, force)
         else:
             raise ValueError(f"Invalid input: {input_path}")
             
@@ -310,19 +686,35 @@ def parse_args():
     parser.add_argument("--input", required=True, help="Path to .txt/.zip file or folder")
     parser.add_argument("--output", required=True, help="Output directory")
     parser.add_argument("--num-questions", type=int, default=300, help="Questions per file (default: 300)")
-    parser.add_argument("--batch-size", type=int, default=25, help="Questions per API call (default: 25)")
+    parser.add_argument("--batch-size", type=int, default=25, help="Questions per API call; larger batches mean fewer round trips "
+                             "but cover fewer distinct chunks of the text (default: 25)")
+    parser.add_argument("--concurrency", type=int, default=8, help="API calls in flight at once per file (default: 8)")
+    parser.add_argument("--max-files", type=int, default=4, help="Files processed concurrently (default: 4)")
+    parser.add_argument("--rpm", type=int, default=10, help="Max API requests per minute, 0 = unlimited (default: 10)")
+    parser.add_argument("--tpm", type=int, default=250_000, help="Max prompt tokens per minute, 0 = unlimited (default: 250000)")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate files whose output already has --num-questions Q&A")
+    parser.add_argument("--context-cache", action="store_true",
+                        help="Cache instructions + text server-side when batches reuse a chunk")
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
+    rate_limiter = AsyncRateLimiter(args.rpm, args.tpm)
+    USE_CONTEXT_CACHE = args.context_cache
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
     
     print("🚀 Q&A Generation Started!")
-    handle_input_path(
+    # One event loop for the whole run: the async Gemini client binds its
+    # channel to the loop it first runs on
+    asyncio.run(handle_input_path(
         Path(args.input), 
         output_dir, 
         args.num_questions,
-        args.batch_size
-    )
+        args.batch_size,
+        args.concurrency,
+        args.max_files,
+        args.force
+    ))
     print("\n🎉 All Done!")